@@ -0,0 +1,70 @@
+"""
+Compares the minimum of Example.adaptive_landscape with the uniform plot grid and with a dense reference grid around
+the minimum, and times both samplings. The adaptive minimum must not be worse than the reference.
+
+Run from the repository root: python -m benchmarks.bench_adaptive_landscape
+"""
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from python_experiment.main import Example, Example2, Cross
+
+# Points per side of the uniform grid and of the reference grid, and half size of the reference grid in uniform
+# grid spacings
+N_UNIFORM = 2000
+N_REFERENCE = 2001
+REFERENCE_SPACINGS = 10
+# Relative excess over the reference compliance accepted for the adaptive minimum
+TOLERANCE = 1e-7
+
+
+def reference_minimum(example: Example, x1: float, x2: float) -> tuple[float, float, float]:
+    """
+    Minimum of the effective compliance on a dense grid around (x1, x2).
+    """
+    half_x = REFERENCE_SPACINGS * (example.X_PLOT_MAX - example.X_PLOT_MIN) / (N_UNIFORM - 1)
+    half_y = REFERENCE_SPACINGS * (example.Y_PLOT_MAX - example.Y_PLOT_MIN) / (N_UNIFORM - 1)
+    x_mesh, y_mesh = np.meshgrid(np.linspace(x1 - half_x, x1 + half_x, N_REFERENCE),
+                                 np.linspace(x2 - half_y, x2 + half_y, N_REFERENCE))
+    z_mesh = example.c_ef(x_mesh, y_mesh)
+    i_min = np.unravel_index(np.nanargmin(z_mesh), z_mesh.shape)
+    return x_mesh[i_min], y_mesh[i_min], z_mesh[i_min]
+
+
+def main():
+    example2 = Example2()
+    example2.BETA = 0.1
+    example2.THETA_R = np.pi / 12
+    cross = Cross()
+
+    for name, example in (('Example2', example2), ('Cross', cross)):
+        # The adaptive sampling runs first, so mu is fixed at the same design as in the plots
+        start = time.perf_counter()
+        *_, adaptive = example.adaptive_landscape()
+        adaptive_time = time.perf_counter() - start
+
+        example.N_POINTS = N_UNIFORM
+        start = time.perf_counter()
+        *_, uniform = example.landscape()
+        uniform_time = time.perf_counter() - start
+
+        reference = min(reference_minimum(example, *uniform[:2]), reference_minimum(example, *adaptive[:2]),
+                        key=lambda minimum: minimum[2])
+
+        print(f'{name}')
+        for label, (x1, x2, c), elapsed in (('adaptive', adaptive, adaptive_time),
+                                            ('uniform', uniform, uniform_time),
+                                            ('reference', reference, None)):
+            timing = '' if elapsed is None else f'  time: {elapsed:7.3f} s'
+            print(f'  {label:>9s}  x1: {x1:.7f}  x2: {x2:.7f}  c: {c:.6f}{timing}')
+
+        if adaptive[2] > reference[2] * (1 + TOLERANCE):
+            raise AssertionError(f'{name}: adaptive minimum {adaptive[2]} above the reference {reference[2]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Times Modeller.write_dxf on grid ground structures of increasing size, for the structure and for its optimized
+topology. The time per element should stay roughly constant.
+
+Run from the repository root: python -m benchmarks.bench_dxf_export
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import shapely as sp
+
+from data_handler import Modeller, SaveData, Optimizer, ComplianceNominal, Material, GroundStructure
+from data_handler.results import LastIteration, Iteration
+
+
+def main():
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as folder:
+        for n in (20, 40, 80, 160):
+            ground_structure = GroundStructure.grid(sp.box(0, 0, n, n), spacing=1.0, level=2)
+            forces = np.zeros((len(ground_structure.points), 2))
+            top = ground_structure.points[:, 1] == n
+            forces[top, 1] = -np.linspace(1.0, 2.0, top.sum())
+            supports = np.zeros_like(forces, dtype=bool)
+            supports[ground_structure.points[:, 1] == 0] = True
+
+            modeller = Modeller(filename=os.path.join(folder, f'grid_{n}.json'), data_to_save=SaveData(),
+                                optimizer=Optimizer(compliance=ComplianceNominal()))
+            modeller.structure = ground_structure.structure(Material(1, 1.0), forces=forces, supports=supports)
+            areas = rng.random(len(modeller.structure.elements)) ** 4
+            modeller.last_iteration = LastIteration(Iteration(1, areas=areas.tolist()))
+
+            times = []
+            for optimized in (False, True):
+                start = time.perf_counter()
+                modeller.write_dxf(optimized=optimized)
+                times.append(time.perf_counter() - start)
+
+            n_elements = len(modeller.structure.elements)
+            print(f'elements: {n_elements:>8d}  structure: {times[0]:7.3f} s ({1e6 * times[0] / n_elements:6.2f} '
+                  f'us/element)  optimized: {times[1]:7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
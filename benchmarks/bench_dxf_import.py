@@ -0,0 +1,53 @@
+"""
+Times Modeller.read_structure_from_dxf on grid ground structures of increasing size. The time per element should
+stay roughly constant, i.e. the import grows linearly with the number of elements.
+
+Run from the repository root: python -m benchmarks.bench_dxf_import
+"""
+import os
+import tempfile
+import time
+
+import ezdxf
+
+from data_handler import Modeller, SaveData, Optimizer, ComplianceNominal, Material
+
+
+def write_grid_dxf(filename: str, n: int):
+    """
+    Writes a n x n grid of nodes connected by horizontal, vertical and diagonal lines.
+    """
+    doc = ezdxf.new('R2010')
+    msp = doc.modelspace()
+    doc.layers.add(name='elements_default')
+    for i in range(n):
+        for j in range(n):
+            if i + 1 < n:
+                msp.add_line((i, j), (i + 1, j), dxfattribs={'layer': 'elements_default'})
+            if j + 1 < n:
+                msp.add_line((i, j), (i, j + 1), dxfattribs={'layer': 'elements_default'})
+            if i + 1 < n and j + 1 < n:
+                msp.add_line((i, j), (i + 1, j + 1), dxfattribs={'layer': 'elements_default'})
+                msp.add_line((i + 1, j), (i, j + 1), dxfattribs={'layer': 'elements_default'})
+    doc.saveas(filename)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        for n in (20, 40, 80, 160):
+            filename = os.path.join(folder, f'grid_{n}.json')
+            write_grid_dxf(filename.replace('.json', '.dxf'), n)
+
+            modeller = Modeller(filename=filename, data_to_save=SaveData(),
+                                optimizer=Optimizer(compliance=ComplianceNominal()))
+            start = time.perf_counter()
+            modeller.read_structure_from_dxf(elements_material=Material(1, 1.0), tolerance=1e-9)
+            elapsed = time.perf_counter() - start
+
+            n_elements = len(modeller.structure.elements)
+            print(f'elements: {n_elements:>8d}  nodes: {len(modeller.structure.nodes):>7d}  '
+                  f'time: {elapsed:8.3f} s  time/element: {1e6 * elapsed / n_elements:7.2f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Compares the time to build and draw the optimized structure with one PathPatch per element (the previous renderer)
+and with the LineCollection renderer of Modeller.plot_optimized_structure.
+
+Run from the repository root: python -m benchmarks.bench_plot
+"""
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.colors as colors
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import PatchCollection
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+
+from data_handler import Modeller, SaveData, Optimizer, ComplianceNominal, Material, Structure, LastIteration
+from data_handler.results import Iteration
+
+
+def random_modeller(n_elements: int) -> Modeller:
+    rng = np.random.default_rng(0)
+    n_nodes = max(2, int(np.sqrt(n_elements)) * 4)
+    structure = Structure.from_arrays(positions=rng.random((n_nodes, 2)),
+                                      connectivity=rng.integers(0, n_nodes, (n_elements, 2)),
+                                      materials=[Material(1, 1.0)])
+    last_iteration = LastIteration(Iteration(idt=1, areas=rng.random(n_elements).tolist()))
+    return Modeller(filename='bench.json', data_to_save=SaveData(), optimizer=Optimizer(ComplianceNominal()),
+                    structure=structure, last_iteration=last_iteration)
+
+
+def patches_renderer(modeller: Modeller, ax: plt.Axes, base_width: float = 1.0, cutoff: float = 1e-4):
+    colormap = colors.ListedColormap(plt.cm.jet(np.linspace(0, 1, 10)))
+    patches = []
+    areas = modeller.last_iteration_norm_areas()
+    for i, element in enumerate(modeller.structure.elements):
+        if areas[i] > cutoff:
+            p1 = element.nodes[0].position
+            p2 = element.nodes[1].position
+            path = Path([p1, p2], [Path.MOVETO, Path.LINETO])
+            patches.append(PathPatch(path, edgecolor=colormap(areas[i]), lw=base_width * areas[i]))
+    ax.add_collection(PatchCollection(patches, match_original=True))
+    ax.set_xlim(modeller.x_limits())
+    ax.set_ylim(modeller.y_limits())
+
+
+def collection_renderer(modeller: Modeller, ax: plt.Axes):
+    modeller.plot_optimized_structure(plot_supports=False, plot_loads=False, ax=ax)
+
+
+def measure(renderer, modeller: Modeller) -> tuple[float, float]:
+    fig, ax = plt.subplots()
+    start = time.perf_counter()
+    renderer(modeller, ax)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fig.canvas.draw()
+    draw = time.perf_counter() - start
+    plt.close(fig)
+    return build, draw
+
+
+def main():
+    for n_elements in (1_000, 10_000, 100_000):
+        modeller = random_modeller(n_elements)
+        for name, renderer in (('PathPatch', patches_renderer), ('LineCollection', collection_renderer)):
+            build, draw = measure(renderer, modeller)
+            print(f'elements: {n_elements:>7d}  {name:>14s}  build: {build:7.3f} s  draw: {draw:7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,5 +3,14 @@ from .modeller import Modeller
 from .save_data import SaveData
 from .optimizer import Optimizer
 from .results import ResultIterations, LastIteration
+from .iterations_store import IterationsStore
+from .result_log import ResultLog
+from .runner import CaseRunner, CaseResult, OptimizationWorker
+from .result_cache import ResultCache
+from .dxf_cache import DxfCache
+from .fea import TrussSolver, TrussAnalysis
+from .landscape import GroupedCompliance
+from .member_adding import MemberAdding
+from .ground_structure import GroundStructure
 from .compliances import ComplianceNominal, ComplianceMu, CompliancePNorm, ComplianceSmoothTheta
 from .structure import Structure, Material, Element, Node
\ No newline at end of file
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 
 class BaseData:
+    __slots__ = ()
 
     @classmethod
     def read_dict(cls, dct: dict) -> type(BaseData):
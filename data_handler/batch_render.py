@@ -0,0 +1,119 @@
+"""
+Headless rendering of result files. Each json file gives three png files next to it (or in output_dir):
+<case>_initial.png, <case>_optimized.png and <case>_compliance.png. The files are spread over a process pool and
+drawn with the non-interactive Agg backend, so no display is needed.
+
+Usage: python -m data_handler.batch_render flower_1-1_1.json flower_2-1_1.json --processes 8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+
+INITIAL_STRUCTURE = {'default_width': 0.5,
+                     'lc_width': 3,
+                     'supports_markers_size': 0.05,
+                     'supports_markers_width': 2,
+                     'supports_markers_color': 'green',
+                     'forces_markers_size': 1,
+                     'forces_markers_color': 'gray'}
+
+OPTIMIZED_STRUCTURE = {'cutoff': 1e-4,
+                       'base_width': 3,
+                       'supports_markers_size': 0.05,
+                       'supports_markers_width': 2,
+                       'supports_markers_color': 'green',
+                       'forces_markers_size': 1,
+                       'forces_markers_color': 'gray'}
+
+
+def _init_worker():
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+
+
+def render_result(filename: str, output_dir: str | None = None, dpi: int = 300, rasterize: bool = False,
+                  initial_structure: dict | None = None, optimized_structure: dict | None = None) -> list[str]:
+    """
+    Renders the initial structure, the optimized structure and the compliance history of a result file.
+    :param filename: json result file
+    :param output_dir: folder of the png files. Defaults to the folder of the json file.
+    :param dpi: resolution of the figures
+    :param rasterize: draws the optimized structure with Modeller.render_optimized_structure, for huge structures
+    :param initial_structure: arguments of Modeller.plot_initial_structure. Defaults to INITIAL_STRUCTURE.
+    :param optimized_structure: arguments of Modeller.plot_optimized_structure. Defaults to OPTIMIZED_STRUCTURE.
+    :return: png files written
+    """
+    import matplotlib.pyplot as plt
+    from .modeller import Modeller
+
+    modeller = Modeller.read(filename)
+    base = os.path.splitext(os.path.basename(filename))[0]
+    base = os.path.join(os.path.dirname(filename) if output_dir is None else output_dir, base)
+
+    written = []
+
+    fig, ax = plt.subplots()
+    modeller.plot_initial_structure(ax=ax, **(INITIAL_STRUCTURE if initial_structure is None else initial_structure))
+    fig.savefig(f'{base}_initial.png', dpi=dpi)
+    plt.close(fig)
+    written.append(f'{base}_initial.png')
+
+    if modeller.last_iteration is not None:
+        if rasterize:
+            modeller.render_optimized_structure(f'{base}_optimized.png')
+        else:
+            fig, ax = plt.subplots()
+            modeller.plot_optimized_structure(ax=ax, **(OPTIMIZED_STRUCTURE if optimized_structure is None
+                                                        else optimized_structure))
+            fig.savefig(f'{base}_optimized.png', dpi=dpi)
+            plt.close(fig)
+        written.append(f'{base}_optimized.png')
+
+    fig, ax = plt.subplots()
+    modeller.plot_compliance(ax=ax)
+    fig.savefig(f'{base}_compliance.png', dpi=dpi)
+    plt.close(fig)
+    written.append(f'{base}_compliance.png')
+
+    return written
+
+
+def render_results(filenames: list[str], processes: int | None = None, **kwargs) -> dict[str, list[str]]:
+    """
+    Renders the result files in parallel. See render_result for the keyword arguments.
+    :param filenames: json result files
+    :param processes: number of worker processes. Defaults to the number of cores.
+    :return: png files written for each result file
+    """
+    if output_dir := kwargs.get('output_dir'):
+        os.makedirs(output_dir, exist_ok=True)
+
+    written = {}
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as executor:
+        futures = {executor.submit(render_result, filename, **kwargs): filename for filename in filenames}
+        for future in as_completed(futures):
+            written[futures[future]] = future.result()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Renders result files to png without a display.')
+    parser.add_argument('filenames', nargs='+', help='json result files')
+    parser.add_argument('--processes', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--output-dir', default=None, help='folder of the png files')
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--rasterize', action='store_true', help='rasterize the optimized structure with NumPy')
+    args = parser.parse_args()
+
+    for filename, pngs in render_results(args.filenames, processes=args.processes, output_dir=args.output_dir,
+                                         dpi=args.dpi, rasterize=args.rasterize).items():
+        print(f'{filename}: {", ".join(pngs)}')
+
+
+if __name__ == '__main__':
+    matplotlib.use('Agg')
+    main()
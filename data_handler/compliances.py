@@ -1,9 +1,42 @@
 from __future__ import annotations
 
+import numpy as np
 from .base_data import BaseData
 from math import pi
 
+
+def smooth_max(x: np.ndarray, y: np.ndarray, mu: np.ndarray | float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Smooth maximum (x + y + sqrt((x - y)^2 + mu^2)) / 2 and its derivatives with respect to x and y.
+    """
+    root = np.sqrt((x - y) ** 2 + np.square(mu))
+    ratio = np.divide(x - y, root, out=np.zeros(np.broadcast(x, y, root).shape), where=root > 0)
+    return (x + y + root) / 2, (1 + ratio) / 2, (1 - ratio) / 2
+
+
+def tensor_eigenvalues(txx: np.ndarray, tyy: np.ndarray,
+                       txy: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Eigenvalues of the compliance tensors [[txx, txy], [txy, tyy]] (smallest, largest) and their gradients with
+    respect to (txx, tyy, txy), of shape (..., 3).
+    """
+    mean = (txx + tyy) / 2
+    half_diff = (txx - tyy) / 2
+    radius = np.hypot(half_diff, txy)
+
+    safe = np.where(radius > 0, radius, 1.0)
+    d_radius = np.stack([half_diff / (2 * safe), -half_diff / (2 * safe), txy / safe], axis=-1)
+    d_radius[radius == 0] = 0.0
+    d_mean = np.broadcast_to([0.5, 0.5, 0.0], d_radius.shape)
+    return mean - radius, mean + radius, d_mean - d_radius, d_mean + d_radius
+
+
 class Compliance(BaseData):
+    """
+    Measure of the compliance of a structure under loads of uncertain direction. The measures are functions of the
+    compliance tensor of the loaded node, [[txx, txy], [txy, tyy]], where txx and tyy are the compliances of the
+    horizontal and vertical components of the load and txy is their mutual compliance.
+    """
     _KEY = ''
 
     @property
@@ -13,6 +46,23 @@ class Compliance(BaseData):
     def parameters(self) -> dict:
         pass
 
+    def evaluate(self, txx: np.ndarray, tyy: np.ndarray, txy: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluates the measure for many tensors at once. The components are broadcast together.
+        :return: objective (...) and its gradient with respect to (txx, tyy, txy), of shape (..., 3)
+        """
+        pass
+
+    @staticmethod
+    def design_derivatives(gradient: np.ndarray, diff_txx: np.ndarray, diff_tyy: np.ndarray,
+                           diff_txy: np.ndarray) -> np.ndarray:
+        """
+        Derivatives of the objective with respect to the design variables from the gradient of evaluate and the
+        derivatives of the tensor components, of shape (..., n_variables).
+        """
+        return (gradient[..., 0, None] * diff_txx + gradient[..., 1, None] * diff_tyy
+                + gradient[..., 2, None] * diff_txy)
+
     @classmethod
     def read_dict(cls, dct: dict) -> type(Compliance):
         pass
@@ -29,6 +79,13 @@ class ComplianceNominal(Compliance):
     def read_dict(cls, dct: dict) -> type(Compliance):
         return cls()
 
+    def evaluate(self, txx: np.ndarray, tyy: np.ndarray, txy: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compliance of the nominal load, txx + tyy + 2 * txy.
+        """
+        txx, tyy, txy = np.broadcast_arrays(*(np.asarray(t, dtype=float) for t in (txx, tyy, txy)))
+        return txx + tyy + 2 * txy, np.broadcast_to([1.0, 1.0, 2.0], txx.shape + (3,))
+
     def to_dict(self):
         return {'key': self.key}
 
@@ -47,6 +104,22 @@ class ComplianceMu(Compliance):
     def parameters(self) -> dict:
         return {'beta': self.beta}
 
+    def evaluate(self, txx: np.ndarray, tyy: np.ndarray, txy: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Smooth maximum of the eigenvalues of the tensor with mu = beta * (txx + tyy) / 2.
+        """
+        txx, tyy, txy = np.broadcast_arrays(*(np.asarray(t, dtype=float) for t in (txx, tyy, txy)))
+        c_min, c_max, d_min, d_max = tensor_eigenvalues(txx, tyy, txy)
+        mu = self.beta * (txx + tyy) / 2
+
+        objective, d_obj_max, d_obj_min = smooth_max(c_max, c_min, mu)
+        root = 2 * objective - c_max - c_min
+        d_obj_mu = np.divide(mu, 2 * root, out=np.zeros_like(root), where=root > 0)
+        d_mu = np.array([self.beta / 2, self.beta / 2, 0.0])
+
+        gradient = d_obj_max[..., None] * d_max + d_obj_min[..., None] * d_min + d_obj_mu[..., None] * d_mu
+        return objective, gradient
+
 
 class CompliancePNorm(Compliance):
     _KEY = 'p_norm'
@@ -61,7 +134,25 @@ class CompliancePNorm(Compliance):
 
     def parameters(self) -> dict:
         return {'p': self.p}
-    
+
+    def evaluate(self, txx: np.ndarray, tyy: np.ndarray, txy: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        p-norm of the eigenvalues of the tensor (the largest eigenvalue for p = inf).
+        """
+        txx, tyy, txy = np.broadcast_arrays(*(np.asarray(t, dtype=float) for t in (txx, tyy, txy)))
+        c_min, c_max, d_min, d_max = tensor_eigenvalues(txx, tyy, txy)
+        if np.isinf(self.p):
+            return c_max, d_max
+
+        # Scaled by the largest eigenvalue to avoid overflows with large p
+        ratio = np.divide(np.abs(c_min), np.abs(c_max), out=np.zeros_like(c_max), where=c_max != 0)
+        factor = (1 + ratio ** self.p) ** (1 / self.p)
+        objective = np.abs(c_max) * factor
+
+        d_obj_max = np.sign(c_max) / factor ** (self.p - 1)
+        d_obj_min = np.sign(c_min) * (ratio / factor) ** (self.p - 1)
+        return objective, d_obj_max[..., None] * d_max + d_obj_min[..., None] * d_min
+
 
 class ComplianceSmoothTheta(Compliance):
     _KEY = 'smooth_theta'
@@ -79,3 +170,44 @@ class ComplianceSmoothTheta(Compliance):
     def parameters(self) -> dict:
         return {'theta_r': self.theta_r,
                 'beta': self.beta}
+
+    def critical_angles(self, txx: np.ndarray, tyy: np.ndarray, txy: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Angles of the loads in [-theta_r, theta_r] where the compliance is largest and smallest, clamped to the
+        interval. When both critical angles are outside the interval on the same side, the limits are returned.
+        """
+        theta_max = np.arctan2(2 * txy, txx - tyy) / 2
+        theta_min = theta_max + pi / 2
+        theta_min = np.where(theta_min <= pi / 2, theta_min, theta_max - pi / 2)
+
+        outside = (((theta_max <= -self.theta_r) & (theta_min <= -self.theta_r))
+                   | ((theta_max >= self.theta_r) & (theta_min >= self.theta_r)))
+        theta_1 = np.where(outside, -self.theta_r, np.clip(theta_max, -self.theta_r, self.theta_r))
+        theta_2 = np.where(outside, self.theta_r, np.clip(theta_min, -self.theta_r, self.theta_r))
+        return theta_1, theta_2
+
+    def evaluate(self, txx: np.ndarray, tyy: np.ndarray, txy: np.ndarray,
+                 mu: np.ndarray | float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Smooth maximum of the compliances of the loads at the critical angles.
+        :param mu: smoothing parameter. Defaults to beta * (txx + tyy) / 2 of each tensor.
+        """
+        txx, tyy, txy = np.broadcast_arrays(*(np.asarray(t, dtype=float) for t in (txx, tyy, txy)))
+        theta_1, theta_2 = self.critical_angles(txx, tyy, txy)
+
+        def compliance(theta):
+            cos, sin = np.cos(2 * theta), np.sin(2 * theta)
+            # The angles are stationary points or fixed limits, so their derivatives do not contribute
+            return ((txx + tyy) / 2 + (txx - tyy) / 2 * cos + txy * sin,
+                    np.stack([(1 + cos) / 2, (1 - cos) / 2, sin], axis=-1))
+
+        c1, d_c1 = compliance(theta_1)
+        c2, d_c2 = compliance(theta_2)
+
+        objective, d_obj_1, d_obj_2 = smooth_max(c1, c2, self.beta * (txx + tyy) / 2 if mu is None else mu)
+        gradient = d_obj_1[..., None] * d_c1 + d_obj_2[..., None] * d_c2
+        if mu is None:
+            root = 2 * objective - c1 - c2
+            d_obj_mu = np.divide(self.beta * (txx + tyy) / 2, 2 * root, out=np.zeros_like(root), where=root > 0)
+            gradient = gradient + d_obj_mu[..., None] * np.array([self.beta / 2, self.beta / 2, 0.0])
+        return objective, gradient
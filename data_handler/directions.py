@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import numpy as np
+
+# Angle (in radians) below which two directions from a point are taken as the same
+DIRECTION_TOLERANCE = 1e-9
+
+
+def nearest_along_directions(points: np.ndarray, origins: np.ndarray, targets: np.ndarray,
+                             tolerance: float = DIRECTION_TOLERANCE) -> np.ndarray:
+    """
+    Mask of the directed pairs (origins, targets) whose target is the nearest of the targets of its origin in its
+    direction, i.e. the segments that do not pass through another target of the same origin. The directions from
+    each origin are sorted by angle and runs of angles closer than tolerance (also across -pi/pi) are merged, so
+    nearly equal angles are grouped even when they are rounded differently.
+    :param points: nodal coordinates (n_nodes, 2)
+    :param origins: node indices of the origins of the pairs
+    :param targets: node indices of the targets of the pairs, different from their origins
+    :param tolerance: maximum angle between consecutive directions of a group
+    """
+    origins = np.asarray(origins, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    n = len(origins)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+
+    delta = points[targets] - points[origins]
+    angle = np.arctan2(delta[:, 1], delta[:, 0])
+    distance = np.hypot(delta[:, 0], delta[:, 1])
+
+    order = np.lexsort((angle, origins))
+    sorted_origins = origins[order]
+    sorted_angle = angle[order]
+    first = np.ones(n, dtype=bool)
+    first[1:] = sorted_origins[1:] != sorted_origins[:-1]
+    new_group = first.copy()
+    new_group[1:] |= np.diff(sorted_angle) > tolerance
+    groups = np.cumsum(new_group) - 1
+
+    # The last group of an origin wraps around to the first one when their angles are within tolerance
+    starts = np.flatnonzero(first)
+    ends = np.append(starts[1:], n) - 1
+    wrap = (sorted_angle[starts] + 2 * np.pi - sorted_angle[ends] <= tolerance) & (groups[ends] != groups[starts])
+    relabel = np.arange(groups[-1] + 1)
+    relabel[groups[ends[wrap]]] = groups[starts[wrap]]
+    groups = relabel[groups]
+
+    by_distance = np.lexsort((distance[order], groups))
+    nearest = np.ones(n, dtype=bool)
+    nearest[1:] = groups[by_distance][1:] != groups[by_distance][:-1]
+
+    mask = np.zeros(n, dtype=bool)
+    mask[order[by_distance[nearest]]] = True
+    return mask
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from .result_cache import CACHE_DIR
+
+
+class DxfCache:
+    """
+    On-disk cache of parsed dxf ground structures. The arrays of a dxf file (see Modeller.parse_dxf) are stored in a
+    .npz file named after the hash of its path and are valid while the file keeps its mtime and size or, when these
+    change, its content hash.
+    """
+    ARRAYS = ('positions', 'connectivity', 'layout_constraints', 'element_ids', 'forces', 'supports')
+
+    def __init__(self, folder: str = os.path.join(CACHE_DIR, 'dxf')):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def __repr__(self):
+        return f'DxfCache(folder={self.folder})'
+
+    @staticmethod
+    def content_hash(filename: str) -> str:
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as file:
+            while chunk := file.read(1 << 20):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def path(self, filename: str, tolerance: float) -> str:
+        key = hashlib.sha256(f'{os.path.abspath(filename)}:{tolerance!r}'.encode()).hexdigest()
+        return os.path.join(self.folder, f'{key}.npz')
+
+    def get(self, filename: str, tolerance: float = 0.0) -> dict[str, np.ndarray] | None:
+        """
+        Arrays of the dxf file, or None if they are not cached or the file changed.
+        """
+        path = self.path(filename, tolerance)
+        try:
+            with np.load(path) as data:
+                cached = dict(data)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+        stat = os.stat(filename)
+        if cached['mtime'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+            return {key: cached[key] for key in self.ARRAYS}
+
+        # Touched but maybe not modified (e.g. checked out again)
+        if str(cached['content_hash']) == self.content_hash(filename):
+            self.put(filename, tolerance, cached)
+            return {key: cached[key] for key in self.ARRAYS}
+        return None
+
+    def put(self, filename: str, tolerance: float, arrays: dict[str, np.ndarray]):
+        stat = os.stat(filename)
+        descriptor, tmp = tempfile.mkstemp(suffix='.npz', dir=self.folder)
+        with os.fdopen(descriptor, 'wb') as file:
+            np.savez(file, mtime=stat.st_mtime_ns, size=stat.st_size, content_hash=self.content_hash(filename),
+                     **{key: arrays[key] for key in self.ARRAYS})
+        os.replace(tmp, self.path(filename, tolerance))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import io
+
+import numpy as np
+from ezdxf.document import Drawing
+from ezdxf.lldxf.const import VALID_DXF_LINEWEIGHTS
+
+# Application of the areas written as XDATA of the lines (group code 1040)
+DXF_APPID = 'ROBUSTFEA'
+
+
+def lineweights(areas: np.ndarray, max_lineweight: int = 211) -> np.ndarray:
+    """
+    Valid dxf line weights (1/100 mm) proportional to the square roots of the areas (the widths of the members), with
+    max_lineweight for the largest area.
+    """
+    valid = np.array(VALID_DXF_LINEWEIGHTS[1:])
+    widths = max_lineweight * np.sqrt(np.asarray(areas, dtype=float) / np.max(areas))
+    index = np.clip(np.searchsorted(valid, widths), 1, len(valid) - 1)
+    index -= widths - valid[index - 1] < valid[index] - widths
+    return valid[index]
+
+
+def save_dxf(doc: Drawing, filename: str, segments: np.ndarray, segment_layers: np.ndarray, points: np.ndarray,
+             point_layers: np.ndarray, segment_lineweights: np.ndarray | None = None,
+             segment_areas: np.ndarray | None = None):
+    """
+    Saves a document with lines and points in its modelspace. ezdxf only writes the tables of the document (the
+    layers must already exist), while the entities are formatted in bulk from the arrays, which avoids creating and
+    exporting one ezdxf entity per line.
+    :param doc: document without entities in the modelspace
+    :param filename: dxf file
+    :param segments: ends of the lines (n_lines, 2, 2)
+    :param segment_layers: layer of each line
+    :param points: positions of the points (n_points, 2)
+    :param point_layers: layer of each point
+    :param segment_lineweights: line weight of each line. Defaults to the line weight of the layer.
+    :param segment_areas: area of each line, written as XDATA of DXF_APPID
+    """
+    msp = doc.modelspace()
+    if len(msp):
+        raise ValueError('The modelspace of the document must be empty')
+    if segment_areas is not None and DXF_APPID not in doc.appids:
+        doc.appids.new(DXF_APPID)
+
+    # Handles of the entities, reserved before the document writes the handle seed
+    n_entities = len(segments) + len(points)
+    first = int(doc.entitydb.handles.next(), 16)
+    doc.entitydb.handles.reset(f'{first + n_entities:X}')
+
+    owner = msp.block_record_handle
+    line = f'  0\nLINE\n  5\n{{:X}}\n330\n{owner}\n100\nAcDbEntity\n  8\n{{}}\n'
+    if segment_lineweights is not None:
+        line += '370\n{}\n'
+    line += '100\nAcDbLine\n 10\n{!r}\n 20\n{!r}\n 30\n0.0\n 11\n{!r}\n 21\n{!r}\n 31\n0.0\n'
+    if segment_areas is not None:
+        line += f'1001\n{DXF_APPID}\n1040\n{{!r}}\n'
+    point = f'  0\nPOINT\n  5\n{{:X}}\n330\n{owner}\n100\nAcDbEntity\n  8\n{{}}\n100\nAcDbPoint\n 10\n{{!r}}\n' \
+            f' 20\n{{!r}}\n 30\n0.0\n'
+
+    segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+    columns = [range(first, first + len(segments)), np.asarray(segment_layers).tolist()]
+    if segment_lineweights is not None:
+        columns.append(np.asarray(segment_lineweights).tolist())
+    columns += segments.T.tolist()
+    if segment_areas is not None:
+        columns.append(np.asarray(segment_areas, dtype=float).tolist())
+
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    entities = ''.join(line.format(*row) for row in zip(*columns))
+    entities += ''.join(point.format(*row) for row in zip(range(first + len(segments), first + n_entities),
+                                                          np.asarray(point_layers).tolist(), *points.T.tolist()))
+
+    stream = io.StringIO()
+    doc.write(stream)
+    text = stream.getvalue()
+    marker = '  2\nENTITIES\n'
+    index = text.index(marker) + len(marker)
+    with open(filename, 'wt', encoding=doc.output_encoding, errors='dxfreplace') as file:
+        file.write(text[:index])
+        file.write(entities)
+        file.write(text[index:])
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import numpy as np
+from scipy.sparse import coo_matrix, csc_matrix, identity
+from scipy.sparse.linalg import splu
+
+from .structure import Structure
+
+
+class TrussAnalysis:
+    """
+    Linear elastic response of a truss to one or more load cases. For a single load case:
+
+    - displacements (n_nodes, 2);
+    - strains (n_elements,): elongations divided by the lengths;
+    - forces (n_elements,): axial forces, positive in tension;
+    - compliance: work of the loads on the displacements.
+
+    With n_cases load cases the arrays gain a leading (n_cases,) axis and compliance is an array (n_cases,).
+    """
+
+    def __init__(self, displacements: np.ndarray, strains: np.ndarray, forces: np.ndarray,
+                 compliance: float | np.ndarray):
+        self.displacements = displacements
+        self.strains = strains
+        self.forces = forces
+        self.compliance = compliance
+
+    def __repr__(self):
+        return f'TrussAnalysis(compliance={self.compliance})'
+
+
+class TrussSolver:
+    """
+    Sparse direct solver of a truss. The stiffness matrix is assembled in vectorized COO form from the lengths,
+    cosines, Young's modulus and areas of the elements. The supported degrees of freedom and the degrees of freedom
+    of nodes without stiffness (e.g. nodes connected only to elements with zero area) are eliminated, and the
+    reduced matrix is factorized once, so solving for other loads only costs the triangular solves.
+    """
+
+    def __init__(self, structure: Structure, areas: np.ndarray | None = None, tikhonov: float = 0.0):
+        """
+        :param structure: structure analysed. Its geometry, materials and supports are read once.
+        :param areas: areas of the elements. Defaults to the areas of the structure.
+        :param tikhonov: regularization added to the diagonal of the reduced matrix, relative to its mean diagonal
+        (as in the julia optimizer, which uses 1e-12)
+        """
+        self.structure = structure
+        self.areas = structure.areas.copy() if areas is None else np.asarray(areas, dtype=float)
+        self.stiffness = stiffness_matrix(structure, self.areas)
+
+        n_dofs = 2 * len(structure.positions)
+        diagonal = self.stiffness.diagonal()
+        self.free = np.flatnonzero(~structure.supports.reshape(-1) & (diagonal > 0.0))
+        self.n_dofs = n_dofs
+
+        reduced = self.stiffness[self.free][:, self.free]
+        if tikhonov > 0.0:
+            reduced = reduced + tikhonov * diagonal[self.free].mean() * identity(len(self.free), format='csc')
+        try:
+            self._factor = splu(csc_matrix(reduced))
+        except RuntimeError as error:
+            raise ValueError(f'The stiffness matrix is singular (the structure is a mechanism): {error}') from None
+
+    def solve(self, forces: np.ndarray | None = None) -> TrussAnalysis:
+        """
+        :param forces: nodal forces (n_nodes, 2) or (n_cases, n_nodes, 2). Defaults to the forces of the structure.
+        """
+        forces = self.structure.forces if forces is None else np.asarray(forces, dtype=float)
+        n_nodes = len(self.structure.positions)
+        loads = forces.reshape(-1, 2 * n_nodes).T
+
+        eliminated = np.ones(self.n_dofs, dtype=bool)
+        eliminated[self.free] = False
+        eliminated &= ~self.structure.supports.reshape(-1)
+        if np.any(loads[eliminated] != 0.0):
+            raise ValueError('Forces applied to nodes without stiffness')
+
+        displacements = np.zeros_like(loads)
+        displacements[self.free] = self._factor.solve(np.ascontiguousarray(loads[self.free]))
+
+        u = displacements.T.reshape(-1, n_nodes, 2)
+        connectivity = self.structure.connectivity
+        delta = u[:, connectivity[:, 1]] - u[:, connectivity[:, 0]]
+        strains = (delta[..., 0] * self.structure.cosines + delta[..., 1] * self.structure.sines) \
+            / self.structure.lengths
+        member_forces = strains * self.structure.youngs() * self.areas
+        compliance = np.einsum('ij,ij->j', loads, displacements)
+
+        if forces.ndim == 2:
+            return TrussAnalysis(u[0], strains[0], member_forces[0], float(compliance[0]))
+        return TrussAnalysis(u, strains, member_forces, compliance)
+
+
+def stiffness_matrix(structure: Structure, areas: np.ndarray | None = None) -> csc_matrix:
+    """
+    Global stiffness matrix (2 * n_nodes, 2 * n_nodes) of the structure. The degrees of freedom of node i are 2 * i
+    (x) and 2 * i + 1 (y).
+    """
+    areas = structure.areas if areas is None else np.asarray(areas, dtype=float)
+    cosines = structure.cosines
+    sines = structure.sines
+    stiffness = structure.youngs() * areas / structure.lengths
+
+    # Element matrices k * [b b^T] with b = [-c, -s, c, s]
+    b = np.column_stack([-cosines, -sines, cosines, sines])
+    values = stiffness[:, None, None] * b[:, :, None] * b[:, None, :]
+
+    connectivity = structure.connectivity.astype(np.int64)
+    dofs = np.column_stack([2 * connectivity[:, 0], 2 * connectivity[:, 0] + 1,
+                            2 * connectivity[:, 1], 2 * connectivity[:, 1] + 1])
+    rows = np.broadcast_to(dofs[:, :, None], values.shape)
+    columns = np.broadcast_to(dofs[:, None, :], values.shape)
+
+    n_dofs = 2 * len(structure.positions)
+    return coo_matrix((values.ravel(), (rows.ravel(), columns.ravel())), shape=(n_dofs, n_dofs)).tocsc()
+
+
+def analyse(structure: Structure, areas: np.ndarray | None = None, forces: np.ndarray | None = None,
+            tikhonov: float = 0.0) -> TrussAnalysis:
+    """
+    Solves the structure for its forces (or the given ones) with the areas of the structure (or the given ones).
+    """
+    return TrussSolver(structure, areas, tikhonov).solve(forces)
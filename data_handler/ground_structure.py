@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import ezdxf
+import numpy as np
+import shapely as sp
+from ezdxf import path
+from scipy.spatial import cKDTree
+
+from .directions import nearest_along_directions, DIRECTION_TOLERANCE
+from .structure import Structure, Material
+
+# Candidate members checked at once against the domain
+BATCH_CANDIDATES = 1 << 20
+
+
+class GroundStructure:
+    """
+    Ground structure of a (possibly non-convex, with holes) domain with limited connectivity. The candidate members
+    are the pairs of points closer than the connectivity radius, found with a KD-tree in O(n_points * k), that lie
+    in the domain. Members passing through another node are discarded, as the node is closer and the shorter members
+    to it cover the same line.
+    """
+
+    def __init__(self, domain: sp.Geometry, points: np.ndarray, radius: float, p: float = 2.0,
+                 tolerance: float = 0.0, angle_tolerance: float = DIRECTION_TOLERANCE):
+        """
+        :param domain: polygonal domain
+        :param points: nodal coordinates (n_nodes, 2). Points outside the domain are kept as unconnected nodes.
+        :param radius: maximum length of the members, in the p-norm
+        :param p: Minkowski p-norm of the radius (np.inf for the connectivity levels of a grid)
+        :param tolerance: members farther than tolerance from the domain are discarded
+        :param angle_tolerance: angle (in radians) below which members from a node are taken as collinear
+        """
+        self.domain = domain
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.radius = radius
+        self.p = p
+        self.tolerance = tolerance
+        self.angle_tolerance = angle_tolerance
+        self.tree = cKDTree(self.points)
+        self.elements = self.generate_elements()
+
+    def __repr__(self):
+        return f'GroundStructure(nodes={len(self.points)}, elements={len(self.elements)})'
+
+    @classmethod
+    def grid(cls, domain: sp.Geometry, spacing: float, level: int = 1, tolerance: float = 0.0) -> GroundStructure:
+        """
+        Ground structure on the points of a square grid in the domain. With connectivity level k each node is
+        connected to the nodes up to k grid divisions away in x and y (level 1 connects the 8 neighbours).
+        :param domain: polygonal domain
+        :param spacing: grid spacing
+        :param level: connectivity level
+        :param tolerance: points and members farther than tolerance from the domain are discarded
+        """
+        x_min, y_min, x_max, y_max = domain.bounds
+        x = x_min + spacing * np.arange(int(np.floor((x_max - x_min) / spacing + 1e-9)) + 1)
+        y = y_min + spacing * np.arange(int(np.floor((y_max - y_min) / spacing + 1e-9)) + 1)
+        points = np.stack(np.meshgrid(x, y), axis=-1).reshape(-1, 2)
+
+        region = domain.buffer(tolerance) if tolerance > 0.0 else domain
+        points = points[sp.intersects_xy(region, points[:, 0], points[:, 1])]
+        return cls(domain, points, radius=level * spacing * (1 + 1e-9), p=np.inf, tolerance=tolerance)
+
+    @staticmethod
+    def read_domain(filename: str, layer: str = 'domain', max_distance: float = 1e-2) -> sp.Geometry:
+        """
+        Reads the domain from the closed boundaries (lines, polylines, arcs, circles, splines...) of a dxf layer.
+        Boundaries inside others are holes, following the even-odd rule.
+        :param filename: dxf file
+        :param layer: layer of the boundaries
+        :param max_distance: maximum distance between the curves and their polygonal approximations
+        """
+        lines = []
+        for entity in ezdxf.readfile(filename).modelspace().query(f'*[layer=="{layer}"]'):
+            try:
+                vertices = [(v.x, v.y) for v in path.make_path(entity).flattening(max_distance)]
+            except TypeError:
+                continue
+            if len(vertices) > 1:
+                lines.append(sp.linestrings(vertices))
+        if not lines:
+            raise ValueError(f'No boundaries in the layer "{layer}" of {filename}')
+
+        faces = sp.get_parts(sp.polygonize(sp.get_parts(sp.union_all(lines))))
+        if not len(faces):
+            raise ValueError(f'The boundaries in the layer "{layer}" of {filename} are not closed')
+        return sp.symmetric_difference_all([sp.polygons(sp.get_exterior_ring(face)) for face in faces])
+
+    def generate_elements(self, batch_size: int = BATCH_CANDIDATES) -> np.ndarray:
+        """
+        Members (n_elements, 2) of the ground structure, as 0-based node indices.
+        """
+        pairs = self.tree.query_pairs(self.radius, p=self.p, output_type='ndarray').astype(np.int64)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+        # A node between the ends of a pair is also closer than the radius to both, so the pairs of each node are enough
+        # to find the pairs that pass through another node
+        visible = nearest_along_directions(self.points, np.concatenate([pairs[:, 0], pairs[:, 1]]),
+                                           np.concatenate([pairs[:, 1], pairs[:, 0]]), self.angle_tolerance)
+        pairs = pairs[visible[:len(pairs)]]
+
+        region = self.domain.buffer(self.tolerance) if self.tolerance > 0.0 else self.domain
+        sp.prepare(region)
+        inside = np.empty(len(pairs), dtype=bool)
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            lines = sp.linestrings(np.stack([self.points[batch[:, 0]], self.points[batch[:, 1]]], axis=1))
+            inside[start:start + batch_size] = sp.covers(region, lines)
+
+        return pairs[inside].reshape(-1, 2)
+
+    def nearest(self, points: np.ndarray) -> np.ndarray:
+        """
+        Indices of the nodes nearest to the points (n, 2), e.g. to place forces and supports.
+        """
+        return self.tree.query(np.asarray(points, dtype=float))[1]
+
+    def structure(self, material: Material, area: float = 1.0, forces: np.ndarray | None = None,
+                  supports: np.ndarray | None = None) -> Structure:
+        """
+        Structure of the ground structure.
+        :param material: material of all elements
+        :param area: initial area of all elements
+        :param forces: nodal forces (n_nodes, 2). Defaults to zero.
+        :param supports: nodal supports (n_nodes, 2). Defaults to free nodes.
+        """
+        return Structure.from_arrays(positions=self.points,
+                                     connectivity=self.elements,
+                                     materials=[material],
+                                     areas=area,
+                                     forces=forces,
+                                     supports=supports)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import shutil
+
+import numpy as np
+
+from .results import Iteration, ResultIterations
+
+
+class IterationsStore:
+    """
+    Binary sidecar of the saved iterations of a result file. It is a folder next to the json file
+    (case.json -> case.iterations) with one .npy file per saved field:
+
+    - idt.npy: iteration numbers (n_saved_iterations,);
+    - areas.npy, move.npy: (n_saved_iterations, n_elements);
+    - angles.npy, forces.npy: (n_saved_iterations, n_values) as saved by the optimizer;
+    - compliance.npy, volume.npy, error.npy: (n_saved_iterations,).
+
+    The files are opened as read-only memory maps, so slicing them (e.g. store['areas'][1200] or
+    store['compliance']) does not read the rest of the history.
+    """
+    FOLDER_SUFFIX = '.iterations'
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self._arrays = {}
+        for field in ('idt',) + Iteration.FIELDS:
+            if os.path.exists(path := os.path.join(folder, f'{field}.npy')):
+                self._arrays[field] = np.load(path, mmap_mode='r')
+
+        if 'idt' not in self._arrays:
+            raise FileNotFoundError(f'No iterations store found in "{folder}"')
+
+    def __repr__(self):
+        return f'IterationsStore(folder={self.folder}, n_iterations={len(self)}, fields={self.fields})'
+
+    def __len__(self):
+        return self._arrays['idt'].shape[0]
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        try:
+            return self._arrays[field]
+        except KeyError:
+            raise KeyError(f'Field "{field}" was not saved') from None
+
+    def __contains__(self, field: str) -> bool:
+        return field in self._arrays
+
+    @property
+    def fields(self) -> list[str]:
+        return [field for field in Iteration.FIELDS if field in self._arrays]
+
+    @property
+    def idt(self) -> np.ndarray:
+        return self._arrays['idt']
+
+    def index(self, idt: int) -> int:
+        """
+        Position in the store of the iteration with number idt.
+        """
+        i = int(np.searchsorted(self.idt, idt))
+        if i == len(self) or self.idt[i] != idt:
+            raise KeyError(f'Iteration {idt} was not saved')
+        return i
+
+    def iteration(self, idt: int) -> Iteration:
+        """
+        Saved iteration with number idt. The lists of the Iteration are views of the memory maps.
+        """
+        i = self.index(idt)
+        return Iteration(idt=idt, **{field: self._arrays[field][i] for field in self.fields})
+
+    @classmethod
+    def folder_of(cls, filename: str) -> str:
+        return filename.replace('.json', cls.FOLDER_SUFFIX)
+
+    @classmethod
+    def from_json(cls, filename: str, folder: str | None = None) -> IterationsStore:
+        """
+        Converts the saved iterations of a json result file. The file is streamed twice (to find the sizes and to
+        write the rows), so the conversion does not load the whole history in memory.
+        """
+        folder = cls.folder_of(filename) if folder is None else folder
+
+        n_iterations = sum(1 for _ in ResultIterations.stream(filename, fields=()))
+        first = next(ResultIterations.stream(filename, stop=1), Iteration(idt=None))
+
+        tmp_folder = f'{folder}.tmp'
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        os.makedirs(tmp_folder)
+
+        arrays = {'idt': np.lib.format.open_memmap(os.path.join(tmp_folder, 'idt.npy'), mode='w+',
+                                                   dtype=np.int64, shape=(n_iterations,))}
+        for field in Iteration.FIELDS:
+            if (value := getattr(first, field)) is not None:
+                shape = (n_iterations,) + np.shape(value)
+                arrays[field] = np.lib.format.open_memmap(os.path.join(tmp_folder, f'{field}.npy'), mode='w+',
+                                                          dtype=np.float64, shape=shape)
+
+        fields = [field for field in arrays if field != 'idt']
+        for i, iteration in enumerate(ResultIterations.stream(filename, fields=fields)):
+            for field, array in arrays.items():
+                array[i] = getattr(iteration, field)
+
+        for array in arrays.values():
+            array.flush()
+        del arrays
+
+        shutil.rmtree(folder, ignore_errors=True)
+        os.replace(tmp_folder, folder)
+        return cls(folder)
+
+    @classmethod
+    def open(cls, filename: str, convert: bool = True) -> IterationsStore:
+        """
+        Opens the store of a json result file. When convert is True, the store is (re)created from the json file if
+        it does not exist or is older than it.
+        """
+        folder = cls.folder_of(filename)
+        idt_path = os.path.join(folder, 'idt.npy')
+        if convert and (not os.path.exists(idt_path) or os.path.getmtime(idt_path) < os.path.getmtime(filename)):
+            return cls.from_json(filename, folder)
+        return cls(folder)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Iterator, TextIO
+
+
+class JsonStream:
+    """
+    Incremental reader of a JSON document. Only the values that are read are decoded; the values that are skipped
+    are scanned without being materialized, so the memory used is proportional to the largest value read and not
+    to the whole document.
+
+    Containers are traversed with iter_object and iter_array. For every key (or item) they yield, the caller must
+    consume the value with read_value, skip_value or a nested iter_object/iter_array before asking for the next one.
+    """
+    CHUNK_SIZE = 1 << 20
+
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+    _STRUCTURAL = re.compile(r'[\[\]{}"]')
+    _STRING_END = re.compile(r'["\\]')
+    _DELIMITER = re.compile(r'[\s,\]}]')
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._file = file
+        self.chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """
+        Drops the consumed part of the buffer and reads more data. Returns False at the end of the file.
+        """
+        chunk = self._file.read(max(self.chunk_size, len(self._buffer) - self._pos))
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Returns the next non-whitespace character without consuming it.
+        """
+        while True:
+            self._pos = self._WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of the JSON document')
+
+    def expect(self, char: str):
+        if (found := self.peek()) != char:
+            raise ValueError(f'Expected "{char}" but found "{found}" in the JSON document')
+        self._pos += 1
+
+    def read_value(self):
+        """
+        Decodes and returns the value at the current position.
+        """
+        if self.peek() not in '[{"':
+            # Numbers and literals are only complete when followed by a delimiter or the end of the document
+            while self._DELIMITER.search(self._buffer, self._pos) is None and self._fill():
+                pass
+
+        while True:
+            try:
+                value, self._pos = self._decoder.raw_decode(self._buffer, self._pos)
+                return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+    def skip_value(self):
+        """
+        Moves past the value at the current position without decoding it.
+        """
+        if self.peek() not in '[{':
+            self.read_value()
+            return
+
+        depth = 0
+        while True:
+            if (match := self._STRUCTURAL.search(self._buffer, self._pos)) is None:
+                self._pos = len(self._buffer)
+                if not self._fill():
+                    raise ValueError('Unexpected end of the JSON document')
+                continue
+
+            self._pos = match.end()
+            if (char := match.group()) == '"':
+                self._skip_string()
+            elif char in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _skip_string(self):
+        while True:
+            if (match := self._STRING_END.search(self._buffer, self._pos)) is None:
+                self._pos = len(self._buffer)
+            elif match.group() == '"':
+                self._pos = match.end()
+                return
+            elif match.end() < len(self._buffer):
+                self._pos = match.end() + 1
+                continue
+            else:
+                # The escaped character is in the next chunk
+                self._pos = match.start()
+
+            if not self._fill():
+                raise ValueError('Unexpected end of the JSON document')
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Yields the keys of the object at the current position.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self._pos += 1
+            else:
+                self.expect('}')
+                return
+
+    def iter_array(self) -> Iterator[int]:
+        """
+        Yields the indices of the items of the array at the current position.
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+
+        i = 0
+        while True:
+            yield i
+            i += 1
+            if self.peek() == ',':
+                self._pos += 1
+            else:
+                self.expect(']')
+                return
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .fea import stiffness_matrix
+from .structure import Structure
+
+# Maximum number of matrix entries solved at once. It bounds the memory used by GroupedCompliance.tensors.
+BATCH_ENTRIES = 1 << 22
+
+
+class GroupedCompliance:
+    """
+    Compliance tensor of a small structure whose elements are split in two groups of equal areas x1 and x2. The other
+    elements keep their areas. The stiffness matrix is K0 + x1 * K1 + x2 * K2, so the tensors of many designs are
+    found by stacking the (dense, reduced) matrices of the designs and solving them at once.
+
+    The tensor is [[txx, txy], [txy, tyy]] with txx = fx' K^-1 fx, tyy = fy' K^-1 fy and txy = fx' K^-1 fy, where fx
+    and fy are the horizontal and vertical components of the forces of the structure.
+    """
+
+    def __init__(self, structure: Structure, groups: np.ndarray | None = None, group_ids: tuple[int, int] = (1, 2)):
+        """
+        :param structure: structure with few degrees of freedom
+        :param groups: group of each element. Defaults to the layout constraints of the elements.
+        :param group_ids: groups whose areas are x1 and x2
+        """
+        self.structure = structure
+        self.groups = structure.layout_constraints if groups is None else np.asarray(groups)
+        self.group_ids = tuple(group_ids)
+
+        masks = [self.groups == idt for idt in self.group_ids]
+        if not all(mask.any() for mask in masks):
+            raise ValueError(f'Groups {self.group_ids} must have at least one element each')
+        fixed = ~(masks[0] | masks[1])
+
+        matrices = [stiffness_matrix(structure, np.where(fixed, structure.areas, 0.0))]
+        matrices += [stiffness_matrix(structure, mask.astype(float)) for mask in masks]
+
+        diagonal = sum(matrix.diagonal() for matrix in matrices)
+        self.free = np.flatnonzero(~structure.supports.reshape(-1) & (diagonal > 0.0))
+        self.k0, self.k1, self.k2 = (matrix[self.free][:, self.free].toarray() for matrix in matrices)
+
+        forces = structure.forces.reshape(-1)
+        loads = np.zeros((len(forces), 2))
+        loads[0::2, 0] = forces[0::2]
+        loads[1::2, 1] = forces[1::2]
+        self.loads = loads[self.free]
+
+        self.group_lengths = np.array([structure.lengths[mask].sum() for mask in masks])
+        self.fixed_volume = float(structure.lengths[fixed] @ structure.areas[fixed])
+
+    def tensors(self, x1: np.ndarray, x2: np.ndarray,
+                batch_entries: int = BATCH_ENTRIES) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Components txx, tyy and txy of the compliance tensors for the areas x1 and x2, broadcast together.
+        """
+        x1, x2 = np.broadcast_arrays(np.asarray(x1, dtype=float), np.asarray(x2, dtype=float))
+        shape = x1.shape
+        x1, x2 = x1.ravel(), x2.ravel()
+
+        n = len(self.free)
+        batch = max(1, batch_entries // max(1, n * n))
+        tensors = np.empty((len(x1), 2, 2))
+        for start in range(0, len(x1), batch):
+            stop = start + batch
+            k = self.k0 + x1[start:stop, None, None] * self.k1 + x2[start:stop, None, None] * self.k2
+            u = np.linalg.solve(k, np.broadcast_to(self.loads, (len(k), n, 2)))
+            tensors[start:stop] = self.loads.T @ u
+
+        return (tensors[:, 0, 0].reshape(shape), tensors[:, 1, 1].reshape(shape),
+                tensors[:, 0, 1].reshape(shape))
+
+    def volumes(self, x1: np.ndarray, x2: np.ndarray) -> np.ndarray:
+        return x1 * self.group_lengths[0] + x2 * self.group_lengths[1] + self.fixed_volume
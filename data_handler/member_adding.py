@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .fea import TrussSolver
+from .modeller import Modeller
+from .runner import OptimizationWorker
+from .structure import Structure
+
+# Maximum number of candidate members checked at once
+BATCH_CANDIDATES = 1 << 20
+
+
+class MemberAdding:
+    """
+    Member adding optimization of a ground structure. The optimization starts from the (sparse) structure of the
+    modeller and, after each run, the displacements of the optimized structure are used to find the candidate
+    members that violate the optimality criterion: their virtual strain energy density E * eps^2 is larger than the
+    reference density of the members of the structure, the volume weighted mean of E * eps^2 over the members with
+    non-negligible areas (at the optimum of a compliance problem all these members have the same strain energy
+    density). The candidates have the material of the added members, the first material of the structure. The most
+    violated candidates are added and the structure is optimized again, starting from the previous areas.
+
+    The displacements are found for the loads of the last iteration when they are saved for all the degrees of
+    freedom (the critical loads of the robust measures) and for the forces of the structure otherwise.
+    """
+
+    def __init__(self, modeller: Modeller, candidates: np.ndarray, tolerance: float = 0.01,
+                 max_added_ratio: float = 0.1, max_iterations: int = 20, cutoff: float = 1e-4,
+                 batch_candidates: int = BATCH_CANDIDATES):
+        """
+        :param modeller: case whose structure is the initial ground structure
+        :param candidates: 0-based node indices (n_candidates, 2) of all the members that can be added. Members
+        already in the structure are ignored.
+        :param tolerance: relative excess of the strain of a candidate over the strain of the reference density (the
+        square root of the ratio of the densities) above which it is added
+        :param max_added_ratio: maximum number of members added at once, relative to the members of the structure
+        :param max_iterations: maximum number of optimizations
+        :param cutoff: areas below cutoff times the largest area are not used for the reference density
+        :param batch_candidates: maximum number of candidates checked at once
+        """
+        self.modeller = modeller
+        self.tolerance = tolerance
+        self.max_added_ratio = max_added_ratio
+        self.max_iterations = max_iterations
+        self.cutoff = cutoff
+        self.batch_candidates = batch_candidates
+
+        candidates = np.sort(np.asarray(candidates, dtype=np.int64).reshape(-1, 2), axis=1)
+        candidates = candidates[candidates[:, 0] != candidates[:, 1]]
+        self.candidates = np.unique(candidates, axis=0)
+        self.history = []
+
+    def pair_keys(self, connectivity: np.ndarray) -> np.ndarray:
+        connectivity = np.sort(np.asarray(connectivity, dtype=np.int64), axis=1)
+        return connectivity[:, 0] * len(self.modeller.structure.positions) + connectivity[:, 1]
+
+    def run(self, worker: OptimizationWorker | None = None) -> Structure:
+        """
+        Optimizes and adds members until no candidate violates the optimality criterion.
+        :param worker: worker that runs the optimizations in memory. Defaults to julia main.jl processes.
+        :return: final structure, also left in the modeller with its results
+        """
+        warm_start = self.modeller.optimizer.warm_start
+        try:
+            for iteration in range(self.max_iterations):
+                self.modeller.optimizer.warm_start = warm_start or iteration > 0
+                # The results of the previous structure are not written back with the case (nor parsed to do so)
+                self.modeller.result_iterations = None
+                self.modeller.last_iteration = None
+                self.modeller.optimize(worker, in_memory=worker is not None)
+
+                added, max_violation = self.violated_candidates()
+                self.history.append({'members': len(self.modeller.structure.elements),
+                                     'compliance': self.modeller.last_iteration.iteration.compliance,
+                                     'max_violation': max_violation,
+                                     'added': len(added)})
+                if len(added) == 0:
+                    break
+                self.add_members(added)
+        finally:
+            self.modeller.optimizer.warm_start = warm_start
+
+        return self.modeller.structure
+
+    def violated_candidates(self) -> tuple[np.ndarray, float]:
+        """
+        Candidates (n_added, 2) to add to the optimized structure of the modeller, from the most violated, and the
+        largest ratio between the virtual strain of a candidate and the strain of the reference density.
+        """
+        structure = self.modeller.structure
+        iteration = self.modeller.last_iteration.iteration
+        areas = np.maximum(np.array(iteration.areas, dtype=float), self.modeller.optimizer.x_min)
+
+        forces = np.asarray(iteration.forces if iteration.forces is not None else [], dtype=float)
+        forces = forces.reshape(-1, 2) if forces.size == structure.forces.size else structure.forces
+        analysis = TrussSolver(structure, areas, tikhonov=1e-12).solve(forces)
+
+        # Volume weighted mean strain energy density of the members that take part in the optimized structure
+        active = areas > self.cutoff * areas.max()
+        volumes = areas[active] * structure.lengths[active]
+        reference = volumes @ (structure.youngs()[active] * analysis.strains[active] ** 2) / volumes.sum()
+
+        new = ~np.isin(self.pair_keys(self.candidates), self.pair_keys(structure.connectivity))
+        candidates = self.candidates[new]
+        # Virtual strains of the candidates: projected relative displacements divided by the lengths
+        ratios = np.empty(len(candidates))
+        for start in range(0, len(candidates), self.batch_candidates):
+            batch = candidates[start:start + self.batch_candidates]
+            delta = structure.positions[batch[:, 1]] - structure.positions[batch[:, 0]]
+            elongations = np.einsum('ij,ij->i', analysis.displacements[batch[:, 1]]
+                                    - analysis.displacements[batch[:, 0]], delta)
+            ratios[start:start + len(batch)] = np.abs(elongations) / np.einsum('ij,ij->i', delta, delta)
+        # Ratios of the strains, as the square roots of the ratios of the densities
+        if reference > 0.0:
+            ratios *= np.sqrt(structure.materials[0].young / reference)
+
+        violated = np.flatnonzero(ratios > 1 + self.tolerance)
+        violated = violated[np.argsort(-ratios[violated], kind='stable')]
+        max_added = max(1, int(self.max_added_ratio * len(structure.elements)))
+        return candidates[violated[:max_added]], float(ratios.max(initial=0.0))
+
+    def add_members(self, members: np.ndarray):
+        """
+        Adds members to the structure of the modeller. The current members keep their optimized areas and the new
+        ones start with the mean area of the members that take part in the optimized structure.
+        """
+        structure = self.modeller.structure
+        areas = np.maximum(np.array(self.modeller.last_iteration.iteration.areas, dtype=float),
+                           self.modeller.optimizer.x_min)
+        active = areas > self.cutoff * areas.max()
+
+        n_added = len(members)
+        self.modeller.structure = Structure.from_arrays(
+            positions=structure.positions,
+            connectivity=np.concatenate([structure.connectivity, members]),
+            materials=structure.materials,
+            areas=np.concatenate([areas, np.full(n_added, areas[active].mean())]),
+            material_index=np.concatenate([structure.material_index, np.zeros(n_added, dtype=np.int32)]),
+            layout_constraints=np.concatenate([structure.layout_constraints, np.zeros(n_added, dtype=np.int32)]),
+            forces=structure.forces,
+            supports=structure.supports,
+            node_ids=structure.node_ids,
+            element_ids=np.concatenate([structure.element_ids,
+                                        structure.element_ids.max(initial=0) + 1 + np.arange(n_added)]))
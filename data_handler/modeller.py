@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 import json
+from typing import Callable, Iterator
 import matplotlib.pyplot as plt
-from matplotlib.path import Path
-from matplotlib.patches import PathPatch
-from matplotlib.patches import Ellipse
 import matplotlib.colors as colors
 import numpy as np
-from matplotlib.collections import PatchCollection
+from matplotlib.collections import LineCollection, EllipseCollection
 from .save_data import SaveData
 from matplotlib import cm
 from .optimizer import Optimizer
-from .results import ResultIterations, LastIteration
+from .results import ResultIterations, LastIteration, Iteration
+from .iterations_store import IterationsStore
+from .result_log import ResultLog
+from .json_stream import JsonStream
+from .raster import rasterize_segments, shade, save_png
+from .runner import CaseRunner, OptimizationWorker
+from .dxf_cache import DxfCache
+from .dxf_writer import lineweights, save_dxf
+from .fea import TrussAnalysis, analyse
 from .structure import Node, Element, Structure, Material
 import ezdxf
 from ezdxf.groupby import groupby
@@ -22,7 +28,9 @@ from scipy.io import savemat
 # FONT_MEDIUM_SIZE = 17
 # FONT_BIG_SIZE = 20
 #
-plt.rcParams["font.family"] = "Times New Roman"
+# Falls back to the default serif fonts when Times New Roman is not installed (e.g. on headless servers)
+plt.rcParams["font.family"] = "serif"
+plt.rcParams["font.serif"] = ["Times New Roman"] + plt.rcParams["font.serif"]
 # plt.rc('font', size=FONT_SMALL_SIZE)          # controls default text sizes
 # plt.rc('axes', titlesize=FONT_SMALL_SIZE)     # fontsize of the axes title
 # plt.rc('axes', labelsize=FONT_MEDIUM_SIZE)    # fontsize of the x and y labels
@@ -31,10 +39,95 @@ plt.rcParams["font.family"] = "Times New Roman"
 # plt.rc('legend', fontsize=FONT_SMALL_SIZE)    # legend fontsize
 # plt.rc('figure', titlesize=FONT_BIG_SIZE)  # fontsize of the figure title
 
+class NodeIndex:
+    """
+    Hash index of nodal coordinates used to merge the endpoints of dxf entities in constant time.
+
+    With a positive tolerance the plane is divided in square cells with the tolerance as size and a point is
+    merged with the first node found within the tolerance in its own or in the neighbouring cells.
+    """
+
+    def __init__(self, tolerance: float = 0.0):
+        if tolerance < 0.0:
+            raise ValueError('The tolerance must be non-negative')
+        self.tolerance = tolerance
+        self.positions: list[tuple[float, float]] = []
+        self._index: dict[tuple, list[int]] = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _cell(self, x: float, y: float) -> tuple:
+        if self.tolerance == 0.0:
+            return x, y
+        return int(np.floor(x / self.tolerance)), int(np.floor(y / self.tolerance))
+
+    def find(self, point) -> int | None:
+        """
+        Returns the index of the node that matches the point or None if there is none.
+        """
+        x, y = float(point[0]), float(point[1])
+        cell = self._cell(x, y)
+
+        if self.tolerance == 0.0:
+            found = self._index.get(cell)
+            return found[0] if found else None
+
+        for i in (-1, 0, 1):
+            for j in (-1, 0, 1):
+                for idx in self._index.get((cell[0] + i, cell[1] + j), ()):
+                    px, py = self.positions[idx]
+                    if (px - x) ** 2 + (py - y) ** 2 <= self.tolerance ** 2:
+                        return idx
+        return None
+
+    def add(self, point) -> int:
+        """
+        Returns the index of the node that matches the point, creating a new node if there is none.
+        """
+        if (idx := self.find(point)) is not None:
+            return idx
+
+        position = (float(point[0]), float(point[1]))
+        idx = len(self.positions)
+        self.positions.append(position)
+        self._index.setdefault(self._cell(*position), []).append(idx)
+        return idx
+
+
+class _Section:
+    """
+    Attribute of Modeller holding a section of the json file. Sections of a Modeller read from a file are decoded
+    on first access.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def __get__(self, modeller: Modeller | None, owner=None):
+        if modeller is None:
+            return self
+        if self.key not in modeller._sections:
+            modeller.load_sections([self.key])
+        return modeller._sections[self.key]
+
+    def __set__(self, modeller: Modeller, value):
+        modeller._sections[self.key] = value
+
+
 class Modeller:
+    SECTIONS = ('save_data', 'optimizer', 'input_structure', 'iterations', 'last_iteration')
+
+    data_to_save = _Section('save_data')
+    optimizer = _Section('optimizer')
+    structure = _Section('input_structure')
+    result_iterations = _Section('iterations')
+    last_iteration = _Section('last_iteration')
+
     def __init__(self, filename: str, data_to_save: SaveData, optimizer: Optimizer,
                  result: ResultIterations | None = None, last_iteration: LastIteration | None = None,
                  structure: Structure | None = None):
+        self._sections = {}
         self.filename = filename
         self.data_to_save = data_to_save
         self.optimizer = optimizer
@@ -43,30 +136,54 @@ class Modeller:
         self.structure = structure
 
     @classmethod
-    def read(cls, filename: str) -> Modeller:
-        with open(filename, 'r') as file:
-            file_data = json.load(file)
-
-        try:
-            result = ResultIterations.read_dict(file_data)
-        except KeyError:
-            result = None
-
-        try:
-            last_iteration = LastIteration.read_dict(file_data)
-        except KeyError:
-            last_iteration = None
-
-        data_to_save = SaveData.read_dict(file_data)
-        optimizer = Optimizer.read_dict(file_data)
-        structure = Structure.read_dict(file_data['input_structure'])
-
-        return cls(filename=filename,
-                   data_to_save=data_to_save,
-                   structure=structure,
-                   optimizer=optimizer,
-                   result=result,
-                   last_iteration=last_iteration)
+    def read(cls, filename: str, sections: list[str] | tuple[str] | None = None) -> Modeller:
+        """
+        Reads a json file. The sections are decoded on first access, so only the sections that are used are parsed.
+        :param filename: json file
+        :param sections: sections of Modeller.SECTIONS decoded right away, in a single pass over the file
+        """
+        modeller = cls.__new__(cls)
+        modeller._sections = {}
+        modeller.filename = filename
+        if sections:
+            modeller.load_sections(sections)
+        return modeller
+
+    def is_loaded(self, section: str) -> bool:
+        return section in self._sections
+
+    def load_sections(self, sections: list[str] | tuple[str]):
+        """
+        Decodes the given sections of the json file in a single pass. The other sections are skipped.
+        """
+        if unknown := set(sections) - set(self.SECTIONS):
+            raise ValueError(f'Unknown sections: {sorted(unknown)}')
+
+        file_data = {}
+        with open(self.filename, 'r') as file:
+            stream = JsonStream(file)
+            for key in stream.iter_object():
+                if key in sections:
+                    file_data[key] = stream.read_value()
+                    if len(file_data) == len(sections):
+                        break
+                else:
+                    stream.skip_value()
+
+        self._decode_sections(file_data, sections)
+
+    def _decode_sections(self, file_data: dict, sections: list[str] | tuple[str]):
+        for section in sections:
+            if section == 'save_data':
+                self._sections[section] = SaveData.read_dict(file_data)
+            elif section == 'optimizer':
+                self._sections[section] = Optimizer.read_dict(file_data)
+            elif section == 'input_structure':
+                self._sections[section] = Structure.read_dict(file_data['input_structure'])
+            elif section == 'iterations':
+                self._sections[section] = ResultIterations.read_dict(file_data) if section in file_data else None
+            else:
+                self._sections[section] = LastIteration.read_dict(file_data) if section in file_data else None
 
     def to_dict(self):
         result = {}
@@ -89,10 +206,70 @@ class Modeller:
         with open(self.filename, 'w') as file:
             json.dump(self.to_dict(), file)
 
-    def read_structure_from_dxf(self, elements_material: Material, elements_area: float = 1.0):
-        layers = groupby(entities=ezdxf.readfile(f'{self.filename.replace(".json", ".dxf")}').modelspace(),
-                         dxfattrib='layer')
-        nodes = []
+    def optimize(self, worker: OptimizationWorker | None = None, in_memory: bool = False):
+        """
+        Optimizes the case with a persistent julia worker.
+        :param worker: worker that runs the optimization. Defaults to a julia main.jl process for this case.
+        :param in_memory: when True, the case is sent to the worker without writing the json file and the results
+        are decoded from its reply. Otherwise, the json file is written, optimized in place and its sections are
+        read again on access, and the saved iterations can be followed meanwhile with tail_iterations.
+        """
+        if worker is None:
+            if in_memory:
+                raise ValueError('In-memory optimizations need a worker')
+            self.write_json()
+            self.result_log().clear()
+            with CaseRunner(max_workers=1) as runner:
+                if not (result := runner.run([self.filename])[0]).ok:
+                    raise RuntimeError(f'The optimization failed: {result}')
+            self._sections = {}
+        elif in_memory:
+            case = {'save_data': self.data_to_save.to_dict(),
+                    'input_structure': self.structure.to_dict(),
+                    'optimizer': self.optimizer.to_dict()}
+            self._sections = {}
+            self._decode_sections(worker.optimize_dict(case), self.SECTIONS)
+        else:
+            self.write_json()
+            self.result_log().clear()
+            worker.optimize_file(self.filename)
+            self._sections = {}
+
+    def read_structure_from_dxf(self, elements_material: Material, elements_area: float = 1.0,
+                                tolerance: float = 0.0, cache: DxfCache | None = None):
+        """
+        Builds the structure from the dxf file associated with the json file.
+        :param elements_material: material assigned to all elements
+        :param elements_area: initial area assigned to all elements
+        :param tolerance: distance below which two endpoints are merged into a single node. With 0.0 only
+        coincident endpoints are merged.
+        :param cache: cache of parsed dxf files. The dxf file is only parsed if it is not cached or changed.
+        """
+        filename = self.filename.replace('.json', '.dxf')
+        arrays = None if cache is None else cache.get(filename, tolerance)
+        if arrays is None:
+            arrays = self.parse_dxf(filename, tolerance)
+            if cache is not None:
+                cache.put(filename, tolerance, arrays)
+
+        self.structure = Structure.from_arrays(positions=arrays['positions'],
+                                               connectivity=arrays['connectivity'],
+                                               materials=[elements_material],
+                                               areas=elements_area,
+                                               layout_constraints=arrays['layout_constraints'],
+                                               forces=arrays['forces'],
+                                               supports=arrays['supports'],
+                                               element_ids=arrays['element_ids'])
+
+    @staticmethod
+    def parse_dxf(filename: str, tolerance: float = 0.0) -> dict[str, np.ndarray]:
+        """
+        Reads the ground structure of a dxf file as arrays: positions (n_nodes, 2), connectivity (n_elements, 2) with
+        0-based node indices, layout_constraints and element_ids (n_elements,), forces (n_nodes, 2) and supports
+        (n_nodes, 2).
+        """
+        layers = groupby(entities=ezdxf.readfile(filename).modelspace(), dxfattrib='layer')
+        nodes = NodeIndex(tolerance=tolerance)
         nodes_info = []
         # Elements info: (id, node1, node2, lc_id)
         elements = []
@@ -100,142 +277,144 @@ class Modeller:
         for layer in tqdm(layers.keys(), desc='Reading dxf file'):
             layer_info = layer.split('_')
             if layer_info[0] == 'elements':
+                lc_id = int(layer_info[-1]) if 'lc' in layer_info else 0
                 for entity in tqdm(layers[layer], desc=f'Reading "{layer}"'):
-                    lc_id = 0
-                    if (node1 := entity.dxf.start) not in nodes:
-                        nodes.append(tuple(node1)[:2])
-
-                    if (node2 := entity.dxf.end) not in nodes:
-                        nodes.append(tuple(node2)[:2])
-
-                    if 'lc' in layer_info:
-                        lc_id = int(layer_info[-1])
-
-                    elements.append((el_id, nodes.index(node1) + 1, nodes.index(node2) + 1, lc_id))
+                    node1 = nodes.add(entity.dxf.start)
+                    node2 = nodes.add(entity.dxf.end)
+                    elements.append((el_id, node1, node2, lc_id))
                     el_id += 1
 
             if layer_info[0] == 'nodes':
                 for entity in layers[layer]:
-                    if (node := tuple(entity.dxf.location)[:2]) not in nodes:
-                        nodes.append(node)
+                    node = nodes.add(entity.dxf.location)
                     info = layer.split('_')
-                    nodes_info.append((nodes.index(node), float(info[1]), float(info[2]), info[3] == "True",
+                    nodes_info.append((node, float(info[1]), float(info[2]), info[3] == "True",
                                        info[4] == "True"))
 
-        # Creating structure
-        nodes_structure = []
-        for i, node in enumerate(nodes):
-            nodes_structure.append(Node(idt=i + 1, position=node, force=[0.0, 0.0],
-                                        support=[False, False]))
-
+        forces = np.zeros((len(nodes), 2))
+        supports = np.zeros((len(nodes), 2), dtype=bool)
         for node_info in nodes_info:
-            nodes_structure[node_info[0]].force = [node_info[1], node_info[2]]
-            nodes_structure[node_info[0]].support = [node_info[3], node_info[4]]
-
-        elements_structure = []
-        for element in elements:
-            elements_structure.append(Element(idt=element[0],
-                                              nodes=[nodes_structure[element[1] - 1], nodes_structure[element[2] - 1]],
-                                              material=elements_material, area=elements_area,
-                                              layout_constraint=element[3]))
+            forces[node_info[0]] = [node_info[1], node_info[2]]
+            supports[node_info[0]] = [node_info[3], node_info[4]]
+
+        elements = np.array(elements, dtype=np.int64).reshape(-1, 4)
+        return {'positions': np.asarray(nodes.positions, dtype=float).reshape(-1, 2),
+                'connectivity': elements[:, 1:3],
+                'layout_constraints': elements[:, 3],
+                'element_ids': elements[:, 0],
+                'forces': forces,
+                'supports': supports}
+
+    def write_dxf(self, filename: str | None = None, optimized: bool = False, cutoff: float = 1e-3,
+                  max_lineweight: int = 211):
+        """
+        Writes the structure to a dxf file that read_structure_from_dxf reads back. The layer tables are built once
+        (one layer per layout constraint and per combination of nodal force and support) and the lines and points are
+        written in bulk from the arrays of the structure.
+        :param filename: dxf file. Defaults to the json file with the .dxf extension, or _optimized.dxf when optimized.
+        :param optimized: when True, writes the optimized topology: the elements whose areas in the last iteration
+        are above cutoff times the largest area, with line weights proportional to the square roots of the areas and
+        the areas as XDATA (see dxf_writer.DXF_APPID). The case must have the areas of a last iteration, some of them
+        above the cutoff.
+        :param cutoff: relative area below which the elements are not written in the optimized topology
+        :param max_lineweight: line weight (1/100 mm) of the largest area in the optimized topology
+        """
+        if filename is None:
+            filename = self.filename.replace('.json', '_optimized.dxf' if optimized else '.dxf')
+
+        structure = self.structure
+        connectivity = structure.connectivity
+        layout_constraints = structure.layout_constraints
+        areas = weights = None
+        if optimized:
+            if self.last_iteration is None or self.last_iteration.iteration.areas is None:
+                raise ValueError(f'The case {self.filename} has no optimized areas to write')
+            areas = np.array(self.last_iteration.iteration.areas, dtype=float)
+            visible = areas > cutoff * np.max(areas, initial=0.0)
+            if not visible.any():
+                raise ValueError(f'No element of the case {self.filename} has an optimized area above the cutoff')
+            connectivity, layout_constraints, areas = connectivity[visible], layout_constraints[visible], areas[visible]
+            weights = lineweights(areas, max_lineweight)
 
-        self.structure = Structure(nodes=nodes_structure, elements=elements_structure, materials=[elements_material])
-
-    def write_dxf(self):
         doc = ezdxf.new('R2010', setup=True)
-        msp = doc.modelspace()
         doc.layers.add(name='elements_default', dxfattribs={'color': 7})
-
-        color = 0
-        for element in self.structure.elements:
-            if element.layout_constraint == 0:
-                msp.add_line(element.nodes[0].position, element.nodes[1].position,
-                             dxfattribs={'layer': 'elements_default'})
+        if optimized:
+            doc.header['$LWDISPLAY'] = 1
+
+        constraints, element_layers = np.unique(layout_constraints, return_inverse=True)
+        names = []
+        for layout_constraint in constraints.tolist():
+            if layout_constraint == 0:
+                names.append('elements_default')
             else:
-                layer_name = f'elements_lc_{element.layout_constraint}'
-                try:
-                    doc.layers.get(layer_name)
-                except ValueError:
-                    color = element.layout_constraint % 6 + 1
-                    doc.layers.add(name=layer_name, color=color)
-                msp.add_line(element.nodes[0].position, element.nodes[1].position, dxfattribs={'layer': layer_name})
-
-        for node in self.structure.nodes:
-            if not (all(s is False for s in node.support) and all(f == 0.0 for f in node.force)):
-                layer_name = f'nodes_{node.force[0]}_{node.force[1]}_{node.support[0]}_{node.support[1]}'
-                try:
-                    doc.layers.get(layer_name)
-                except ValueError:
-                    color += 1
-                    doc.layers.add(name=layer_name, color=color % 6 + 1)
-
-                msp.add_point(node.position, dxfattribs={'layer': layer_name})
-
-        doc.saveas(f'{self.filename.replace(".json", ".dxf")}')
+                names.append(f'elements_lc_{layout_constraint}')
+                doc.layers.add(name=names[-1], color=layout_constraint % 6 + 1)
+        element_layers = np.array(names, dtype=object)[element_layers]
+
+        nodes = np.flatnonzero(structure.supports.any(axis=1) | structure.forces.any(axis=1))
+        conditions = np.column_stack([structure.forces[nodes], structure.supports[nodes]])
+        conditions, node_layers = np.unique(conditions, axis=0, return_inverse=True)
+        names = []
+        for i, (fx, fy, sx, sy) in enumerate(conditions.tolist()):
+            names.append(f'nodes_{fx}_{fy}_{bool(sx)}_{bool(sy)}')
+            doc.layers.add(name=names[-1], color=(i + 1) % 6 + 1)
+        node_layers = np.array(names, dtype=object)[node_layers.reshape(-1)]
+
+        save_dxf(doc, filename, structure.positions[connectivity], element_layers, structure.positions[nodes],
+                 node_layers, weights, areas)
 
     def x_limits(self) -> tuple[float, float]:
-        x_min = min([node.position[0] for node in self.structure.nodes])
-        x_max = max([node.position[0] for node in self.structure.nodes])
+        x_min, x_max = self.structure.positions[:, 0].min(), self.structure.positions[:, 0].max()
         return x_min - 0.1 * (x_max - x_min), x_max + 0.1 * (x_max - x_min)
 
     def y_limits(self) -> tuple[float, float]:
-        y_min = min([node.position[1] for node in self.structure.nodes])
-        y_max = max([node.position[1] for node in self.structure.nodes])
+        y_min, y_max = self.structure.positions[:, 1].min(), self.structure.positions[:, 1].max()
         return y_min - 0.1 * (y_max - y_min), y_max + 0.1 * (y_max - y_min)
 
     def last_iteration_norm_areas(self) -> np.ndarray:
         areas = np.sqrt(np.array(self.last_iteration.iteration.areas))
         return areas / areas.max()
 
-    def get_support_markers(self, size: float, width: float, color: str) -> list[PathPatch]:
-        patches = []
-        for node in self.structure.nodes:
-            if node.support[0]:
-                v1 = np.array(node.position) + np.array([-size, 0])
-                v2 = np.array(node.position) + np.array([size, 0])
-                path = Path([v1, v2], [Path.MOVETO, Path.LINETO])
-                patches.append(PathPatch(path, edgecolor=color, lw=width))
-            if node.support[1]:
-                v1 = np.array(node.position) + np.array([0, -size])
-                v2 = np.array(node.position) + np.array([0, size])
-                path = Path([v1, v2], [Path.MOVETO, Path.LINETO])
-                patches.append(PathPatch(path, edgecolor=color, lw=width))
-        return patches
-
-    def get_load_markers(self, color: str='gray', factor: float=3.0) -> list[PathPatch]:
-        patches = []
-        for node in self.structure.nodes:
-            if sum(np.abs(node.force)) > 0:
-                forces = np.abs(np.array(node.force))
-                forces_norm = forces / max(forces)
-                fx = factor * forces_norm[0]
-                fy = factor * forces_norm[1]
-                
-                el = Ellipse(xy=node.position, width=fx, height=fy, angle=0.0, edgecolor=color, lw=0)
-                el.set_alpha(0.5)
-                patches.append(el)
-
-            #if node.force[0] != 0:
-             #   v1 = np.array(node.position) + np.array([-size, 0])
-             #   v2 = np.array(node.position) + np.array([size, 0])
-             #   path = Path([v1, v2], [Path.MOVETO, Path.LINETO])
-            #    patches.append(PathPatch(path, edgecolor=color, lw=width))
-           # if node.force[1] != 0:
-            #    v1 = np.array(node.position) + np.array([0, -size])
-             #   v2 = np.array(node.position) + np.array([0, size])
-            #    path = Path([v1, v2], [Path.MOVETO, Path.LINETO])
-             #   patches.append(PathPatch(path, edgecolor=color, lw=width))
-        return patches
+    def analyse(self, areas: np.ndarray | None = None, optimized: bool = False) -> TrussAnalysis:
+        """
+        Linear analysis of the structure with its forces, without running the optimizer.
+        :param areas: areas of the elements. Defaults to the areas of the structure.
+        :param optimized: when True and areas is None, uses the areas of the last iteration
+        """
+        if areas is None and optimized:
+            areas = np.array(self.last_iteration.iteration.areas, dtype=float)
+        return analyse(self.structure, areas)
+
+    def get_support_markers(self, size: float, width: float, color: str) -> LineCollection:
+        positions = self.structure.positions
+        supports = self.structure.supports
+        segments_x = positions[supports[:, 0], None, :] + np.array([[-size, 0], [size, 0]])
+        segments_y = positions[supports[:, 1], None, :] + np.array([[0, -size], [0, size]])
+        return LineCollection(np.concatenate([segments_x, segments_y]), colors=color, linewidths=width)
+
+    def get_load_markers(self, color: str='gray', factor: float=3.0) -> EllipseCollection:
+        forces = np.abs(self.structure.forces)
+        loaded = forces.sum(axis=1) > 0
+        forces_norm = forces[loaded] / forces[loaded].max(axis=1, keepdims=True)
+        return EllipseCollection(widths=factor * forces_norm[:, 0], heights=factor * forces_norm[:, 1], angles=0.0,
+                                 units='xy', offsets=self.structure.positions[loaded], facecolors=color,
+                                 linewidths=0, alpha=0.5)
+
+    def add_markers(self, ax: plt.Axes, plot_supports: bool, plot_loads: bool, supports_markers_size: float,
+                    supports_markers_width: float, supports_markers_color: str, forces_markers_size: float,
+                    forces_markers_color: str):
+        if plot_supports:
+            ax.add_collection(self.get_support_markers(supports_markers_size, supports_markers_width,
+                                                       supports_markers_color))
+        if plot_loads:
+            load_markers = self.get_load_markers(factor=forces_markers_size, color=forces_markers_color)
+            load_markers.set_offset_transform(ax.transData)
+            ax.add_collection(load_markers)
 
     def get_restricted_elements(self) -> dict[int, list[int]]:
-        data = {}
-        for element in self.structure.elements:
-            if (lc := element.layout_constraint) > 0:
-                if lc in data:
-                    data[lc].append(element.idt)
-                else:
-                    data[lc] = [element.idt]
-        return dict(sorted(data.items()))
+        lcs = self.structure.layout_constraints
+        ids = self.structure.element_ids
+        return {int(lc): ids[lcs == lc].tolist() for lc in np.unique(lcs[lcs > 0])}
 
     def plot_dv_analysis(self, other: Modeller, width: float = 5.0):
         lcs = self.get_restricted_elements()
@@ -247,35 +426,28 @@ class Modeller:
             self_areas = self_areas / max_abs_area
             other_areas = other_areas / max_abs_area
 
-            self_patches = []
-            other_patches = []
-            max_lc_norm_area = -np.inf
-            i = 0
-            for lc in lcs:
-                for el_id in lcs[lc]:
-                    area_self = self_areas[el_id - 1]
-                    area_other = other_areas[el_id - 1]
+            el_ids = np.concatenate([lcs[lc] for lc in lcs])
+            el_colors = cm.tab20(np.concatenate([np.full(len(lcs[lc]), lc % 20) for lc in lcs]))
+            area_self = self_areas[el_ids - 1]
+            area_other = other_areas[el_ids - 1]
+            max_lc_norm_area = max(area_self.max(), area_other.max())
 
-                    max_lc_norm_area = max([max_lc_norm_area, area_self, area_other])
+            x = np.arange(len(el_ids))
+            self_segments = np.stack([np.column_stack([x, np.zeros_like(x)]), np.column_stack([x, area_self])], axis=1)
+            other_segments = np.stack([np.column_stack([x, np.zeros_like(x)]), np.column_stack([x, area_other])],
+                                      axis=1)
 
-                    self_path = Path([[i, 0], [i, area_self]], [Path.MOVETO, Path.LINETO])
-                    other_path = Path([[i, 0], [i, area_other]], [Path.MOVETO, Path.LINETO])
-
-                    self_patches.append(PathPatch(self_path, edgecolor=cm.tab20(lc % 20), lw=width))
-                    other_patches.append(PathPatch(other_path, edgecolor=cm.tab20(lc % 20), lw=width))
-                    i += 1
-
-            n_lc_els = sum([len(lcs[lc]) for lc in lcs])
+            n_lc_els = len(el_ids)
             fig, ax = plt.subplots(2, 1)
 
-            ax[0].add_collection(PatchCollection(self_patches, match_original=True))
+            ax[0].add_collection(LineCollection(self_segments, colors=el_colors, linewidths=width))
             ax[0].set_xlim(0, n_lc_els)
             ax[0].set_ylim(0, 1.1 * max_lc_norm_area)
             ax[0].set_xlabel('Element')
             ax[0].set_ylabel('Normalized area')
             ax[0].set_title(f'Case {self.filename.split("_")[-1].replace(".json", "")}')
 
-            ax[1].add_collection(PatchCollection(other_patches, match_original=True))
+            ax[1].add_collection(LineCollection(other_segments, colors=el_colors, linewidths=width))
             ax[1].set_xlim(0, n_lc_els)
             ax[1].set_ylim(0, 1.1 * max_lc_norm_area)
             ax[1].set_xlabel('Element')
@@ -293,61 +465,54 @@ class Modeller:
                                supports_markers_size: float, forces_markers_size: float,
                                plot_supports: bool = True, plot_loads: bool = True,
                                supports_markers_color: str = 'green',
-                               forces_markers_color: str = 'gray'):
-        patches = []
-        for element in self.structure.elements:
-            p1 = element.nodes[0].position
-            p2 = element.nodes[1].position
-            path = Path([p1, p2], [Path.MOVETO, Path.LINETO])
-
-            if (lc := element.layout_constraint) == 0:
-                color = 'black'
-                width = default_width
-            else:
-                color = cm.tab20(lc % 20)
-                width = lc_width
-
-            patches.append(PathPatch(path, edgecolor=color, lw=width))
-
-        fig, ax = plt.subplots()
-
-        if plot_supports:
-            patches.extend(self.get_support_markers(supports_markers_size, supports_markers_width,
-                                                    supports_markers_color))
-        if plot_loads:
-            patches.extend(self.get_load_markers(factor=forces_markers_size, color=forces_markers_color))
+                               forces_markers_color: str = 'gray', ax: plt.Axes | None = None):
+        """
+        Plots the ground structure. When ax is given, the structure is drawn on it and the figure is not shown.
+        """
+        lcs = self.structure.layout_constraints
+        restricted = lcs > 0
+        el_colors = np.tile(colors.to_rgba('black'), (lcs.shape[0], 1))
+        el_colors[restricted] = cm.tab20(lcs[restricted] % 20)
+        widths = np.where(restricted, lc_width, default_width)
+
+        show = ax is None
+        if show:
+            fig, ax = plt.subplots()
+
+        ax.add_collection(LineCollection(self.structure.segments(), colors=el_colors, linewidths=widths))
+        self.add_markers(ax, plot_supports, plot_loads, supports_markers_size, supports_markers_width,
+                         supports_markers_color, forces_markers_size, forces_markers_color)
 
-        ax.add_collection(PatchCollection(patches, match_original=True))
         ax.set_aspect('equal')
         ax.axis('off')
         ax.set_xlim(self.x_limits())
         ax.set_ylim(self.y_limits())
         # plt.title(f'Initial structure - {self.filename.replace(".json", "")}')
-        plt.show()
+        if show:
+            plt.show()
 
     def plot_optimized_structure(self, base_width: float = 1.0, cutoff: float = 1e-4, plot_supports: bool = True,
                                  plot_loads: bool = True, supports_markers_width: float = 4.0,
                                  supports_markers_size: float = 0.05, supports_markers_color: str = 'green',
-                                 forces_markers_size: float = 0.05, forces_markers_color: str = 'gray'):
+                                 forces_markers_size: float = 0.05, forces_markers_color: str = 'gray',
+                                 ax: plt.Axes | None = None):
+        """
+        Plots the elements with normalized area above the cutoff. When ax is given, the structure is drawn on it and
+        the figure is not shown.
+        """
         colormap = colors.ListedColormap(plt.cm.jet(np.linspace(0, 1, 10)))
-        patches = []
         areas = self.last_iteration_norm_areas()
-        for i, element in enumerate(self.structure.elements):
-            if areas[i] > cutoff:
-                p1 = element.nodes[0].position
-                p2 = element.nodes[1].position
-                path = Path([p1, p2], [Path.MOVETO, Path.LINETO])
-                patches.append(PathPatch(path, edgecolor=colormap(areas[i]), lw=base_width * areas[i]))
+        visible = areas > cutoff
 
-        fig, ax = plt.subplots()
+        show = ax is None
+        if show:
+            fig, ax = plt.subplots()
 
-        if plot_supports:
-            patches.extend(self.get_support_markers(supports_markers_size, supports_markers_width,
-                                                    supports_markers_color))
-        if plot_loads:
-            patches.extend(self.get_load_markers(factor=forces_markers_size, color=forces_markers_color))
+        ax.add_collection(LineCollection(self.structure.segments()[visible], colors=colormap(areas[visible]),
+                                         linewidths=base_width * areas[visible]))
+        self.add_markers(ax, plot_supports, plot_loads, supports_markers_size, supports_markers_width,
+                         supports_markers_color, forces_markers_size, forces_markers_color)
 
-        ax.add_collection(PatchCollection(patches, match_original=True))
         ax.set_aspect('equal')
         ax.axis('off')
         ax.set_xlim(self.x_limits())
@@ -355,42 +520,151 @@ class Modeller:
         #ax.set_title(f'elements: {len(self.structure.elements)} file: {self.filename}')
         # plt.title(f'Optimized structure - {self.filename.replace(".json", "")}')
         plt.colorbar(plt.cm.ScalarMappable(cmap=colormap), ax=ax, shrink=0.5)
-        plt.show()
+        if show:
+            plt.show()
         #plt.savefig(self.filename.replace(".json", ".png"), dpi=300)
 
-    def plot_compliance(self):
-        compliance = np.array([iteration.compliance for iteration in self.result_iterations.iterations])
-        plt.plot(compliance)
-        plt.xlabel('Iteration')
-        plt.ylabel('Compliance')
-        # plt.title(f'Compliance - {self.filename.replace(".json", "")}')
-        plt.show()
-
-    def save_mat_file(self):
-        data = {'fem': {'NNode': len(self.structure.nodes),
-                        'NElem': len(self.structure.elements),
-                        'Vol': self.optimizer.volume_max}}
+    def render_optimized_structure(self, filename: str | None = None, resolution: int = 2000,
+                                   base_width: float = 4.0, cutoff: float = 1e-4):
+        """
+        Rasterizes the elements with normalized area above the cutoff directly into a png file, without matplotlib
+        artists. Meant for structures too large for plot_optimized_structure.
+        :param filename: png file. Defaults to the json file name with the png extension.
+        :param resolution: number of pixels along the largest side of the image
+        :param base_width: width in pixels of the element with the largest area
+        :param cutoff: normalized area below which the elements are not drawn
+        """
+        colormap = colors.ListedColormap(plt.cm.jet(np.linspace(0, 1, 10)))
+        areas = self.last_iteration_norm_areas()
+        visible = areas > cutoff
 
-        for node in self.structure.nodes:
-            node_dict = {'cg': node.force,
-                         'sup': [int(s) for s in node.support],
-                         'x': node.position[0],
-                         'y': node.position[1]}
+        x_min, x_max = self.x_limits()
+        y_min, y_max = self.y_limits()
+        ratio = (y_max - y_min) / (x_max - x_min)
+        if ratio <= 1:
+            shape = (max(1, round(resolution * ratio)), resolution)
+        else:
+            shape = (resolution, max(1, round(resolution / ratio)))
+
+        coverage, weighted = rasterize_segments(self.structure.segments()[visible], base_width * areas[visible],
+                                                areas[visible], shape, (x_min, x_max, y_min, y_max))
+
+        filename = self.filename.replace('.json', '.png') if filename is None else filename
+        save_png(filename, shade(coverage, weighted, colormap))
+
+    def iter_iterations(self, fields: list[str] | tuple[str] | None = None, start: int = 0,
+                        stop: int | None = None, step: int = 1) -> Iterator[Iteration]:
+        """
+        Streams the saved iterations from the json file. See ResultIterations.stream.
+        """
+        return ResultIterations.stream(self.filename, fields=fields, start=start, stop=stop, step=step)
+
+    def iterations_store(self, convert: bool = True) -> IterationsStore:
+        """
+        Opens the binary store of the saved iterations, converting the json file when needed.
+        See IterationsStore.open.
+        """
+        return IterationsStore.open(self.filename, convert=convert)
+
+    def result_log(self) -> ResultLog:
+        """
+        Append-only log of the saved iterations written by the optimizer while it runs. See ResultLog.
+        """
+        return ResultLog(self.filename)
+
+    def tail_iterations(self, follow: bool = True, poll_interval: float = 1.0, timeout: float | None = None,
+                        alive: Callable[[], bool] | None = None) -> Iterator[Iteration]:
+        """
+        Yields the saved iterations of the result log, e.g. to plot the compliance of a running optimization.
+        :param follow: when True, waits for new iterations until the run finishes (see ResultLog.follow). Otherwise,
+        yields the iterations already written.
+        :param poll_interval: seconds between reads of the log
+        :param timeout: seconds without new iterations after which the following stops
+        :param alive: returns False when the optimization process exited
+        """
+        log = self.result_log()
+        if follow:
+            yield from log.follow(poll_interval, timeout, alive)
+        else:
+            yield from log.iterations()
+
+    def plot_compliance(self, ax: plt.Axes | None = None):
+        """
+        Plots the saved compliance history. When ax is given, the history is drawn on it and the figure is not shown.
+        """
+        if self.is_loaded('iterations') and self.result_iterations is not None:
+            iterations = self.result_iterations.iterations
+        else:
+            iterations = self.iter_iterations(fields=['compliance'])
+        compliance = np.array([iteration.compliance for iteration in iterations])
 
-            if 'Node' in data['fem']:
-                data['fem']['Node'].append(node_dict)
-            else:
-                data['fem']['Node'] = [node_dict]
+        show = ax is None
+        if show:
+            fig, ax = plt.subplots()
 
-        for element in self.structure.elements:
-            element_dict = {'nodes': [el.idt for el in element.nodes],
-                            'E': element.area,
-                            'A': element.nodes[0].idt,
-                            'L': element.length()}
+        ax.plot(compliance)
+        ax.set_xlabel('Iteration')
+        ax.set_ylabel('Compliance')
+        # plt.title(f'Compliance - {self.filename.replace(".json", "")}')
+        if show:
+            plt.show()
 
-            if 'Element' in data['fem']:
-                data['fem']['Element'].append(element_dict)
+    def save_mat_file(self, filename: str | None = None, compress: bool = False, results: bool = True,
+                      iterations: bool = False):
+        """
+        Writes the case to a MATLAB file as structs of arrays. The struct 'fem' has:
+
+        - NNode, NElem, Vol: numbers of nodes and elements and maximum volume;
+        - Coord, Load, Supp (NNode, 2): positions, forces and supports (1 if restricted) of the nodes;
+        - Connect (NElem, 2): 1-based rows in Coord of the nodes of the elements;
+        - A, E, L (NElem, 1): areas, Young's moduli and lengths of the elements;
+        - NodeId (NNode, 1), ElemId (NElem, 1): ids of the nodes and elements.
+
+        The results are written as the structs 'result' (last iteration) and 'iterations' (saved iterations), with
+        the fields of Iteration: Idt, Areas, Forces, Angles, Move (n_iterations, n_values) and Compliance, Volume,
+        Error (n_iterations, 1).
+        :param filename: mat file. Defaults to the json file with the .mat extension.
+        :param compress: when True, the arrays are compressed
+        :param results: when True, writes the last iteration, if any
+        :param iterations: when True, writes the saved iterations, read from the iterations store of the json file
+        unless they are loaded
+        """
+        structure = self.structure
+        data = {'fem': {'NNode': len(structure.positions),
+                        'NElem': len(structure.connectivity),
+                        'Vol': self.optimizer.volume_max,
+                        'Coord': structure.positions,
+                        'Connect': structure.connectivity.astype(np.float64) + 1,
+                        'A': structure.areas,
+                        'E': structure.youngs(),
+                        'L': structure.lengths,
+                        'Load': structure.forces,
+                        'Supp': structure.supports.astype(np.float64),
+                        'NodeId': structure.node_ids.astype(np.float64),
+                        'ElemId': structure.element_ids.astype(np.float64)}}
+
+        if results and self.last_iteration is not None:
+            data['result'] = self._mat_iterations([self.last_iteration.iteration], squeeze=True)
+
+        if iterations:
+            if self.is_loaded('iterations') and self.result_iterations is not None:
+                data['iterations'] = self._mat_iterations(self.result_iterations.iterations)
             else:
-                data['fem']['Element'] = [element_dict]
-
-        savemat(f'{self.filename.replace(".json", ".mat")}', data)
+                store = self.iterations_store()
+                data['iterations'] = {field.capitalize(): np.asarray(store[field], dtype=float)
+                                      for field in ('idt',) + tuple(store.fields)}
+
+        savemat(filename or self.filename.replace('.json', '.mat'), data, do_compression=compress, oned_as='column')
+
+    @staticmethod
+    def _mat_iterations(iterations: list[Iteration], squeeze: bool = False) -> dict[str, np.ndarray]:
+        """
+        Fields of the iterations stacked in arrays (n_iterations, ...), or the arrays of a single iteration.
+        """
+        arrays = {}
+        for field in ('idt',) + Iteration.FIELDS:
+            values = [getattr(iteration, field) for iteration in iterations]
+            if all(value is not None for value in values):
+                array = np.array(values, dtype=float)
+                arrays[field.capitalize()] = array[0] if squeeze else array
+        return arrays
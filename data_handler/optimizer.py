@@ -15,7 +15,8 @@ class Optimizer(BaseData):
                  initial_damping=True,
                  use_layout_constraint=False,
                  x_min=1e-12,
-                 tolerance=1e-8):
+                 tolerance=1e-8,
+                 warm_start=False):
         self.compliance = compliance
         self.volume_max = volume_max
         self.min_iterations = min_iterations
@@ -27,6 +28,8 @@ class Optimizer(BaseData):
         self.use_layout_constraint = use_layout_constraint
         self.x_min = x_min
         self.tolerance = tolerance
+        # Starts from the areas of the elements (scaled to volume_max) instead of uniform areas
+        self.warm_start = warm_start
 
     @classmethod
     def read_dict(cls, dct: dict) -> type(BaseData):
@@ -51,7 +54,8 @@ class Optimizer(BaseData):
                    initial_damping=dct[cls.KEY]['initial_damping'],
                    use_layout_constraint=dct[cls.KEY]['use_layout_constraints'],
                    x_min=dct[cls.KEY]['x_min'],
-                   tolerance=dct[cls.KEY]['tolerance'])
+                   tolerance=dct[cls.KEY]['tolerance'],
+                   warm_start=dct[cls.KEY].get('warm_start', False))
 
     def __repr__(self):
         return (f'Optimizer(compliance={self.compliance}, volume_max={self.volume_max}, '
@@ -59,10 +63,10 @@ class Optimizer(BaseData):
                 f'use_adaptive_move={self.use_adaptive_move}, initial_move_multiplier={self.initial_move_multiplier}, '
                 f'use_adaptive_damping={self.use_adaptive_damping}, initial_damping={self.initial_damping}, '
                 f'use_layout_constraint={self.use_layout_constraint}, x_min={self.x_min}, '
-                f'tolerance={self.tolerance})')
+                f'tolerance={self.tolerance}, warm_start={self.warm_start})')
 
     def to_dict(self):
-        return {'compliance': self.compliance.to_dict(),
+        dct = {'compliance': self.compliance.to_dict(),
                 'volume_max': self.volume_max,
                 'min_iterations': self.min_iterations,
                 'max_iterations': self.max_iterations,
@@ -73,3 +77,7 @@ class Optimizer(BaseData):
                 'use_layout_constraints': self.use_layout_constraint,
                 'x_min': self.x_min,
                 'tolerance': self.tolerance}
+        # Only written when set, so the files (and the keys of ResultCache) of the other cases are unchanged
+        if self.warm_start:
+            dct['warm_start'] = True
+        return dct
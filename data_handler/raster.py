@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import Colormap
+
+# Maximum number of samples processed at once. It bounds the memory used by rasterize_segments.
+BATCH_SAMPLES = 1 << 20
+
+
+def rasterize_segments(segments: np.ndarray, widths: np.ndarray, values: np.ndarray, shape: tuple[int, int],
+                       extent: tuple[float, float, float, float],
+                       batch_samples: int = BATCH_SAMPLES) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Accumulates segments into image buffers. Each segment is sampled every pixel along its length and across its
+    width, and every sample adds the image area it covers to its pixel.
+    :param segments: ends of the segments (n, 2, 2) in data coordinates
+    :param widths: widths of the segments (n,) in pixels. Widths below one pixel give partial coverage.
+    :param values: value of each segment (n,), averaged in the pixels weighted by coverage
+    :param shape: (rows, columns) of the image
+    :param extent: (x_min, x_max, y_min, y_max) of the image in data coordinates
+    :param batch_samples: maximum number of samples processed at once
+    :return: coverage (rows, columns), in pixels, and coverage weighted sum of the values (rows, columns)
+    """
+    rows, columns = shape
+    x_min, x_max, y_min, y_max = extent
+
+    # Pixel coordinates, with rows growing downwards
+    origin = np.array([x_min, y_max])
+    scale = np.array([columns / (x_max - x_min), -rows / (y_max - y_min)])
+    segments = np.asarray(segments, dtype=float)
+    widths = np.asarray(widths, dtype=float)
+    values = np.asarray(values, dtype=float)
+
+    lengths = np.hypot((segments[:, 1, 0] - segments[:, 0, 0]) * scale[0],
+                       (segments[:, 1, 1] - segments[:, 0, 1]) * scale[1])
+    n_along = np.maximum(1, np.ceil(lengths)).astype(np.int64)
+    n_across = np.maximum(1, np.ceil(widths)).astype(np.int64)
+    n_samples = n_along * n_across
+
+    coverage = np.zeros(rows * columns)
+    weighted = np.zeros(rows * columns)
+
+    # Batches of segments with at most batch_samples samples (or a single segment)
+    ends = np.cumsum(n_samples)
+    start = 0
+    while start < len(n_samples):
+        offset = ends[start - 1] if start > 0 else 0
+        stop = max(start + 1, int(np.searchsorted(ends, offset + batch_samples, side='right')))
+        batch = slice(start, stop)
+        start = stop
+
+        points = (segments[batch] - origin) * scale
+        delta = points[:, 1] - points[:, 0]
+        normals = np.column_stack([-delta[:, 1], delta[:, 0]]) / np.maximum(lengths[batch], 1e-12)[:, None]
+        along = n_along[batch]
+        across = n_across[batch]
+        width = widths[batch]
+
+        # Samples are at first + i * step_along + j * step_across, with i < n_along and j < n_across
+        step_along = delta / along[:, None]
+        step_across = normals * (width / across)[:, None]
+        first = points[:, 0] + 0.5 * step_along + normals * (width * (0.5 / across - 0.5))[:, None]
+        weights = (lengths[batch] / along) * (width / across)
+
+        counts = n_samples[batch]
+        local = np.arange(ends[stop - 1] - offset) - np.repeat(ends[batch] - counts - offset, counts)
+        sample_across = np.repeat(across, counts)
+        i = local // sample_across
+        j = local - i * sample_across
+
+        x = (np.repeat(first[:, 0], counts) + i * np.repeat(step_along[:, 0], counts)
+             + j * np.repeat(step_across[:, 0], counts))
+        y = (np.repeat(first[:, 1], counts) + i * np.repeat(step_along[:, 1], counts)
+             + j * np.repeat(step_across[:, 1], counts))
+
+        col = np.floor(x).astype(np.int64)
+        row = np.floor(y).astype(np.int64)
+        inside = (col >= 0) & (col < columns) & (row >= 0) & (row < rows)
+        index = row[inside] * columns + col[inside]
+        w = np.repeat(weights, counts)[inside]
+
+        np.add.at(coverage, index, w)
+        np.add.at(weighted, index, w * np.repeat(values[batch], counts)[inside])
+
+    return coverage.reshape(shape), weighted.reshape(shape)
+
+
+def shade(coverage: np.ndarray, weighted: np.ndarray, colormap: Colormap,
+          background: tuple[float, float, float] = (1.0, 1.0, 1.0)) -> np.ndarray:
+    """
+    Converts the buffers of rasterize_segments into a RGB image. The colour of a pixel is the colormap of its mean
+    value and its opacity grows with the accumulated coverage.
+    """
+    mean = np.divide(weighted, coverage, out=np.zeros_like(weighted), where=coverage > 0)
+    alpha = (1.0 - np.exp(-coverage))[..., None].astype(np.float32)
+    rgb = colormap(mean, bytes=True)[..., :3] / np.float32(255.0)
+    return alpha * rgb + (1.0 - alpha) * np.asarray(background, dtype=np.float32)
+
+
+def save_png(filename: str, image: np.ndarray):
+    plt.imsave(filename, np.clip(image, 0.0, 1.0))
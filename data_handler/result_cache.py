@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from .json_stream import JsonStream
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'robustfea')
+
+
+class ResultCache:
+    """
+    Content-addressed cache of optimized json files. A result is stored under the hash of the sections that define
+    the optimization (KEY_SECTIONS), so a case with the same structure and settings is not optimized again.
+    The least recently used results are removed when the cache grows beyond max_bytes.
+    """
+    KEY_SECTIONS = ('input_structure', 'optimizer', 'save_data')
+
+    def __init__(self, folder: str = CACHE_DIR, max_bytes: int = 2 << 30):
+        """
+        :param folder: folder of the cached results
+        :param max_bytes: maximum size of the cached results
+        """
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def __repr__(self):
+        return f'ResultCache(folder={self.folder}, max_bytes={self.max_bytes})'
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    @classmethod
+    def key(cls, case: dict) -> str:
+        """
+        Hash of the key sections of a case (the dict of a json file). Keys are sorted, so it does not depend on the
+        order of the sections or of their fields.
+        """
+        content = json.dumps({section: case[section] for section in cls.KEY_SECTIONS}, sort_keys=True,
+                             separators=(',', ':'))
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    @classmethod
+    def key_of_file(cls, filename: str) -> str:
+        """
+        Hash of the key sections of a json file. The other sections (e.g. saved iterations) are skipped.
+        """
+        case = {}
+        with open(filename, 'r') as file:
+            stream = JsonStream(file)
+            for key in stream.iter_object():
+                if key in cls.KEY_SECTIONS:
+                    case[key] = stream.read_value()
+                else:
+                    stream.skip_value()
+        return cls.key(case)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.folder, f'{key}.json')
+
+    def get(self, key: str, filename: str) -> bool:
+        """
+        Copies the cached result to filename. Returns False if the key is not cached.
+        """
+        try:
+            shutil.copyfile(self.path(key), filename)
+            os.utime(self.path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def put(self, key: str, filename: str):
+        """
+        Stores a copy of the result file and evicts the least recently used results if needed.
+        """
+        descriptor, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.folder)
+        os.close(descriptor)
+        shutil.copyfile(filename, tmp)
+        os.replace(tmp, self.path(key))
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used results until the cache fits in max_bytes.
+        """
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.folder):
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            size = sum(entry[1] for entry in entries)
+            for _, entry_size, path in sorted(entries):
+                if size <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+
+    def clear(self):
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith('.json'):
+                os.remove(entry.path)
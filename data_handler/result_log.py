@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from typing import Callable, Iterator
+
+from .results import Iteration
+
+
+class ResultLog:
+    """
+    Append-only log of the saved iterations of an optimization, written by the julia optimizer next to the json file
+    (case.json -> case.log.jsonl) every SaveData.step iterations. The first line is {"run": ...}, with an id of the
+    run, the next ones are the json objects of the iterations, as in the "iterations" of the result file, and the last
+    line of a finished run is {"finished": true, "idt": ...}.
+
+    The log is read incrementally from the offset of the last complete line, so a running optimization can be
+    followed and the history of a crashed one is kept up to its last saved iteration. A new run truncates the log, so
+    when its first line changes the log is read again from the beginning.
+    """
+    SUFFIX = '.log.jsonl'
+
+    def __init__(self, filename: str):
+        """
+        :param filename: json file of the case
+        """
+        self.filename = filename
+        self.path = self.path_of(filename)
+        self.offset = 0
+        self.finished = False
+        self.run = None
+        self._first_line = b''
+
+    def __repr__(self):
+        return f'ResultLog(path={self.path}, run={self.run}, offset={self.offset}, finished={self.finished})'
+
+    @classmethod
+    def path_of(cls, filename: str) -> str:
+        return re.sub(r'\.json$', '', filename) + cls.SUFFIX
+
+    def read_new(self) -> list[Iteration]:
+        """
+        Iterations appended since the last read. An incomplete last line (being written) is left for the next read.
+        A log with another first line, or shorter than the offset, was started again by a new run and is read from the
+        beginning.
+        """
+        try:
+            with open(self.path, 'rb') as file:
+                first_line = file.readline()
+                if self.offset and (first_line != self._first_line or os.fstat(file.fileno()).st_size < self.offset):
+                    self._restart()
+                file.seek(self.offset)
+                data = file.read()
+        except FileNotFoundError:
+            return []
+
+        end = data.rfind(b'\n') + 1
+        try:
+            records = [json.loads(line) for line in data[:end].splitlines()]
+        except json.JSONDecodeError:
+            # The offset fell in the middle of a line of a new run that the first line did not tell apart (e.g. a log
+            # rewritten between the reads or written without the run line)
+            if self.offset == 0:
+                raise
+            self._restart()
+            return self.read_new()
+
+        if self.offset == 0:
+            self._first_line = data[:data.find(b'\n') + 1]
+        self.offset += end
+        iterations = []
+        for record in records:
+            if 'run' in record:
+                self.run = record['run']
+            elif record.get('finished'):
+                self.finished = True
+            else:
+                iterations.append(Iteration.read_dict(record))
+        return iterations
+
+    def _restart(self):
+        self.offset = 0
+        self.finished = False
+        self.run = None
+        self._first_line = b''
+
+    def clear(self):
+        """
+        Removes the log, e.g. before a new run of the case, so that it is not taken for the log of the new run.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._restart()
+
+    def iterations(self) -> list[Iteration]:
+        """
+        All the iterations in the log.
+        """
+        self._restart()
+        return self.read_new()
+
+    def follow(self, poll_interval: float = 1.0, timeout: float | None = None,
+               alive: Callable[[], bool] | None = None) -> Iterator[Iteration]:
+        """
+        Yields the iterations of the log as they are written, until the run finishes.
+        :param poll_interval: seconds between reads of the log
+        :param timeout: seconds without new iterations after which the following stops. Defaults to no limit.
+        :param alive: returns False when the optimization process exited (e.g. lambda: process.poll() is None). The
+        following then stops after reading the rest of the log.
+        """
+        last = time.monotonic()
+        while True:
+            running = alive is None or alive()
+            iterations = self.read_new()
+            yield from iterations
+
+            if self.finished or not running:
+                return
+            if iterations:
+                last = time.monotonic()
+            elif timeout is not None and time.monotonic() - last > timeout:
+                return
+            time.sleep(poll_interval)
@@ -1,8 +1,12 @@
 from __future__ import annotations
+from typing import Iterator
 from .base_data import BaseData
+from .json_stream import JsonStream
 
 
 class Iteration(BaseData):
+    FIELDS = ('angles', 'areas', 'forces', 'compliance', 'move', 'volume', 'error')
+
     def __init__(self, idt: int, angles: list[float] | None = None, areas: list[float] | None = None,
                  forces: list[float] | None = None, compliance: float | None = None, move: list[float] | None = None,
                  volume: float | None = None, error: float | None = None):
@@ -17,53 +21,14 @@ class Iteration(BaseData):
 
     @classmethod
     def read_dict(cls, dct: dict) -> Iteration:
-        try:
-            idt = dct['idt']
-        except KeyError:
-            idt = None
-        try:
-            angles = dct['angles']
-        except KeyError:
-            angles = None
-
-        try:
-            areas = dct['areas']
-        except KeyError:
-            areas = None
-
-        try:
-            forces = dct['forces']
-        except KeyError:
-            forces = None
-
-        try:
-            compliance = dct['compliance']
-        except KeyError:
-            compliance = None
-
-        try:
-            move = dct['move']
-        except KeyError:
-            move = None
-
-        try:
-            volume = dct['volume']
-        except KeyError:
-            volume = None
-
-        try:
-            error = dct['error']
-        except KeyError:
-            error = None
-
-        return cls(idt=idt,
-                   angles=angles,
-                   areas=areas,
-                   forces=forces,
-                   compliance=compliance,
-                   move=move,
-                   volume=volume,
-                   error=error)
+        return cls(idt=dct.get('idt'),
+                   angles=dct.get('angles'),
+                   areas=dct.get('areas'),
+                   forces=dct.get('forces'),
+                   compliance=dct.get('compliance'),
+                   move=dct.get('move'),
+                   volume=dct.get('volume'),
+                   error=dct.get('error'))
 
     def to_dict(self):
         return {'idt': self.idt,
@@ -90,6 +55,44 @@ class ResultIterations(BaseData):
             iterations.append(Iteration.read_dict(iteration))
         return cls(iterations=iterations)
 
+    @classmethod
+    def stream(cls, filename: str, fields: list[str] | tuple[str] | None = None, start: int = 0,
+               stop: int | None = None, step: int = 1) -> Iterator[Iteration]:
+        """
+        Reads the saved iterations of a result file one at a time, without loading the whole document.
+        :param filename: json file written by the optimizer
+        :param fields: fields of Iteration.FIELDS to read. The others are skipped and set to None. Defaults to all.
+        :param start: index of the first saved iteration to read (the index in the list of saved iterations, not the
+        iteration number, which is stored in Iteration.idt)
+        :param stop: index where the reading stops (exclusive). Defaults to the end of the list.
+        :param step: step between the indices of the saved iterations that are read
+        """
+        if fields is not None and (unknown := set(fields) - set(Iteration.FIELDS)):
+            raise ValueError(f'Unknown iteration fields: {sorted(unknown)}')
+
+        with open(filename, 'r') as file:
+            stream = JsonStream(file)
+            for key in stream.iter_object():
+                if key != cls.KEY:
+                    stream.skip_value()
+                    continue
+
+                for i in stream.iter_array():
+                    if stop is not None and i >= stop:
+                        return
+                    if i < start or (i - start) % step != 0:
+                        stream.skip_value()
+                        continue
+
+                    dct = {}
+                    for field in stream.iter_object():
+                        if field == 'idt' or fields is None or field in fields:
+                            dct[field] = stream.read_value()
+                        else:
+                            stream.skip_value()
+                    yield Iteration.read_dict(dct)
+                return
+
 
 class LastIteration(BaseData):
     KEY = 'last_iteration'
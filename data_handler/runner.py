@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .result_cache import ResultCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_JL = os.path.join(ROOT, 'main.jl')
+WORKER_JL = os.path.join(ROOT, 'worker.jl')
+
+
+class CaseResult:
+    """
+    Outcome of the optimization of a case. status is 'finished' (the process exited, see returncode), 'cached' (the
+    result was copied from the cache), 'timeout' or 'cancelled'.
+    """
+
+    def __init__(self, filename: str, status: str, returncode: int | None, elapsed: float, stdout: str | None,
+                 stderr: str | None):
+        self.filename = filename
+        self.status = status
+        self.returncode = returncode
+        self.elapsed = elapsed
+        self.stdout = stdout
+        self.stderr = stderr
+
+    def __repr__(self):
+        return (f'CaseResult(filename={self.filename}, status={self.status}, returncode={self.returncode}, '
+                f'elapsed={self.elapsed:.1f})')
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ('finished', 'cached') and self.returncode == 0
+
+
+class CaseRunner:
+    """
+    Runs the optimization of json cases as subprocesses (julia main.jl case.json by default), at most max_workers
+    at a time. The standard output and error of each case are written to <case>.stdout.log and <case>.stderr.log
+    next to the json file or in log_dir. With a cache, cases already optimized are copied from it instead of run.
+    """
+
+    def __init__(self, max_workers: int | None = None, timeout: float | None = None,
+                 command: list[str] | tuple[str] = ('julia', MAIN_JL), log_dir: str | None = None,
+                 env: dict[str, str] | None = None, cache: ResultCache | None = None):
+        """
+        :param max_workers: maximum number of cases running at once. Defaults to the number of cores.
+        :param timeout: seconds after which a case is killed. Defaults to no limit.
+        :param command: command that receives the json file as last argument
+        :param log_dir: folder of the log files. Defaults to the folder of each json file.
+        :param env: environment variables added to the current environment of the subprocesses
+        :param cache: cache of the results. The successful results are stored in it.
+        """
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+        self.timeout = timeout
+        self.command = list(command)
+        self.log_dir = log_dir
+        self.env = None if env is None else {**os.environ, **env}
+        self.cache = cache
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.cancel()
+        self.shutdown()
+
+    def log_files(self, filename: str) -> tuple[str, str]:
+        base = os.path.splitext(filename)[0]
+        if self.log_dir is not None:
+            base = os.path.join(self.log_dir, os.path.basename(base))
+        return f'{base}.stdout.log', f'{base}.stderr.log'
+
+    def submit(self, filename: str) -> Future[CaseResult]:
+        """
+        Queues a case. It starts as soon as a worker is free.
+        """
+        return self._executor.submit(self._run_case, filename)
+
+    def run(self, filenames: list[str]) -> list[CaseResult]:
+        """
+        Runs the cases and waits for all of them. The results are in the order of filenames.
+        """
+        return [future.result() for future in [self.submit(filename) for filename in filenames]]
+
+    def cancel(self):
+        """
+        Kills the running cases and skips the queued ones.
+        """
+        self._cancelled.set()
+        with self._lock:
+            for process in self._processes:
+                process.terminate()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def _run_case(self, filename: str) -> CaseResult:
+        if self._cancelled.is_set():
+            return CaseResult(filename, 'cancelled', None, 0.0, None, None)
+
+        start = time.perf_counter()
+        if self.cache is not None:
+            key = self.cache.key_of_file(filename)
+            if self.cache.get(key, filename):
+                return CaseResult(filename, 'cached', 0, time.perf_counter() - start, None, None)
+
+        if self.log_dir is not None:
+            os.makedirs(self.log_dir, exist_ok=True)
+        stdout, stderr = self.log_files(filename)
+
+        with open(stdout, 'w') as out, open(stderr, 'w') as err:
+            process = subprocess.Popen(self.command + [os.path.abspath(filename)], stdout=out, stderr=err,
+                                       env=self.env)
+            with self._lock:
+                self._processes.add(process)
+                if self._cancelled.is_set():
+                    process.terminate()
+            try:
+                returncode = process.wait(timeout=self.timeout)
+                status = 'cancelled' if self._cancelled.is_set() and returncode != 0 else 'finished'
+            except subprocess.TimeoutExpired:
+                process.kill()
+                returncode = process.wait()
+                status = 'timeout'
+            finally:
+                with self._lock:
+                    self._processes.discard(process)
+
+        result = CaseResult(filename, status, returncode, time.perf_counter() - start, stdout, stderr)
+        if self.cache is not None and result.ok:
+            self.cache.put(key, filename)
+        return result
+
+
+class OptimizationWorker:
+    """
+    Client of a persistent julia process (worker.jl) that loads and compiles the optimizer once and then optimizes
+    the cases it receives, so only the first case pays the startup and compilation time. Requests are sent one at a
+    time through the stdin of the process and the replies are read from its stdout.
+    """
+
+    def __init__(self, command: list[str] | tuple[str] = ('julia', WORKER_JL), warm_up: str | None = None,
+                 log_file: str | None = None, env: dict[str, str] | None = None):
+        """
+        :param command: command that starts the worker
+        :param warm_up: json case optimized (on a temporary copy) when the worker starts, to compile the optimizer
+        :param log_file: file that receives the log of the optimizations. Defaults to the current stderr.
+        :param env: environment variables added to the current environment of the worker
+        """
+        self._log = None if log_file is None else open(log_file, 'w')
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._process = subprocess.Popen(list(command) + ([os.path.abspath(warm_up)] if warm_up else []),
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._log,
+                                         env=None if env is None else {**os.environ, **env}, text=True, bufsize=1)
+        self._read_reply('ready')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    def optimize_file(self, filename: str):
+        """
+        Optimizes a json case. The results are written to the file, as with main.jl.
+        """
+        self._request({'filename': os.path.abspath(filename)})
+
+    def optimize_dict(self, case: dict) -> dict:
+        """
+        Optimizes an in-memory case (the dict of a json file) and returns the dict of the resulting file.
+        """
+        return self._request({'case': case})['case']
+
+    def close(self, timeout: float = 10.0):
+        """
+        Closes the stdin of the worker, which finishes it after the current request.
+        """
+        if self._process.stdin and not self._process.stdin.closed:
+            self._process.stdin.close()
+        try:
+            self._process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process.stdout.close()
+        if self._log is not None:
+            self._log.close()
+
+    def _request(self, request: dict) -> dict:
+        with self._lock:
+            if not self.alive:
+                raise RuntimeError(f'The worker exited with code {self._process.returncode}')
+            request['id'] = next(self._ids)
+            self._process.stdin.write(json.dumps(request) + '\n')
+            self._process.stdin.flush()
+            reply = self._read_reply('ok', request['id'])
+        return reply
+
+    def _read_reply(self, status: str, idt: int | None = None) -> dict:
+        if not (line := self._process.stdout.readline()):
+            raise RuntimeError(f'The worker exited with code {self._process.wait()}')
+
+        reply = json.loads(line)
+        if reply['status'] == 'error':
+            raise RuntimeError(f'The optimization failed: {reply["message"]}')
+        if reply['status'] != status or reply.get('id') != idt:
+            raise RuntimeError(f'Unexpected reply from the worker: {line.strip()}')
+        return reply
@@ -3,16 +3,97 @@ from .base_data import BaseData
 import numpy as np
 
 
+class _NodesColumns:
+    """
+    Columnar storage of a single node that does not belong to a structure yet.
+    """
+
+    def __init__(self):
+        self.node_ids = np.zeros(1, dtype=np.int64)
+        self.positions = np.zeros((1, 2))
+        self.forces = np.zeros((1, 2))
+        self.supports = np.zeros((1, 2), dtype=bool)
+
+    def _set_position(self, index: int, value: list[float]):
+        self.positions[index] = value
+
+
+class _ElementsColumns:
+    """
+    Columnar storage of a single element that does not belong to a structure yet.
+    """
+
+    def __init__(self, nodes: list[Node], material: Material):
+        self.nodes = list(nodes)
+        self.materials = [material]
+        self.element_ids = np.zeros(1, dtype=np.int64)
+        self.connectivity = np.array([[0, 1]], dtype=np.int32)
+        self.areas = np.zeros(1)
+        self.material_index = np.zeros(1, dtype=np.int32)
+        self.layout_constraints = np.zeros(1, dtype=np.int32)
+
+    def _set_connectivity(self, index: int, value: list[int]):
+        self.connectivity[index] = value
+
+
 class Node(BaseData):
+    """
+    View of a row of the nodal arrays of a structure. Nodes created outside a structure keep their own single row
+    arrays until they are added to a structure.
+    """
+    __slots__ = ('_columns', '_index')
+
     def __init__(self, idt: int, position: list[float], force: list[float] | tuple[float] = (0.0, 0.0),
                  support: list[bool] | tuple[bool] = (False, False)):
+        self._columns = _NodesColumns()
+        self._index = 0
         self.idt = idt
         self.position = position
         self.force = force
         self.support = support
 
+    @classmethod
+    def _view(cls, columns, index: int) -> Node:
+        node = cls.__new__(cls)
+        node._columns = columns
+        node._index = index
+        return node
+
+    @property
+    def idt(self) -> int:
+        return int(self._columns.node_ids[self._index])
+
+    @idt.setter
+    def idt(self, value: int):
+        self._columns.node_ids[self._index] = value
+
+    @property
+    def position(self) -> np.ndarray:
+        return self._columns.positions[self._index]
+
+    @position.setter
+    def position(self, value: list[float]):
+        self._columns._set_position(self._index, value)
+
+    @property
+    def force(self) -> np.ndarray:
+        return self._columns.forces[self._index]
+
+    @force.setter
+    def force(self, value: list[float]):
+        self._columns.forces[self._index] = value
+
+    @property
+    def support(self) -> np.ndarray:
+        return self._columns.supports[self._index]
+
+    @support.setter
+    def support(self, value: list[bool]):
+        self._columns.supports[self._index] = value
+
     def __repr__(self):
-        return f'Node(idt={self.idt}, position={self.position}, force={self.force}, support={self.support})'
+        return (f'Node(idt={self.idt}, position={self.position.tolist()}, force={self.force.tolist()}, '
+                f'support={self.support.tolist()})')
 
     @classmethod
     def read_dict(cls, dct: dict) -> Node:
@@ -20,9 +101,9 @@ class Node(BaseData):
 
     def to_dict(self):
         return {'idt': self.idt,
-                'position': self.position,
-                'force': self.force,
-                'support': self.support}
+                'position': self.position.tolist(),
+                'force': self.force.tolist(),
+                'support': self.support.tolist()}
 
 
 class Material(BaseData):
@@ -43,25 +124,107 @@ class Material(BaseData):
 
 
 class Element(BaseData):
+    """
+    View of a row of the elements arrays of a structure. Elements created outside a structure keep their own single
+    row arrays until they are added to a structure.
+    """
+    __slots__ = ('_columns', '_index')
+
     def __init__(self, idt: int, nodes: list[Node], material: Material, area: float, layout_constraint):
+        self._columns = _ElementsColumns(nodes, material)
+        self._index = 0
         self.idt = idt
-        self.nodes = nodes
-        self.material = material
         self.area = area
         self.layout_constraint = layout_constraint
 
+    @classmethod
+    def _view(cls, columns, index: int) -> Element:
+        element = cls.__new__(cls)
+        element._columns = columns
+        element._index = index
+        return element
+
+    @property
+    def idt(self) -> int:
+        return int(self._columns.element_ids[self._index])
+
+    @idt.setter
+    def idt(self, value: int):
+        self._columns.element_ids[self._index] = value
+
+    @property
+    def nodes(self) -> list[Node]:
+        return [self._columns.nodes[i] for i in self._columns.connectivity[self._index]]
+
+    @nodes.setter
+    def nodes(self, value: list[Node]):
+        if isinstance(self._columns, _ElementsColumns):
+            self._columns.nodes = list(value)
+        elif any(node._columns is not self._columns for node in value):
+            raise ValueError('The nodes must belong to the structure of the element')
+        else:
+            self._columns._set_connectivity(self._index, [node._index for node in value])
+
+    @property
+    def material(self) -> Material:
+        return self._columns.materials[self._columns.material_index[self._index]]
+
+    @material.setter
+    def material(self, value: Material):
+        materials = self._columns.materials
+        for i, material in enumerate(materials):
+            if material is value:
+                break
+        else:
+            i = len(materials)
+            materials.append(value)
+        self._columns.material_index[self._index] = i
+
+    @property
+    def area(self) -> float:
+        return float(self._columns.areas[self._index])
+
+    @area.setter
+    def area(self, value: float):
+        self._columns.areas[self._index] = value
+
+    @property
+    def layout_constraint(self) -> int:
+        return int(self._columns.layout_constraints[self._index])
+
+    @layout_constraint.setter
+    def layout_constraint(self, value: int):
+        self._columns.layout_constraints[self._index] = value
+
     def __repr__(self):
         return (f'Element(idt={self.idt}, nodes={[self.nodes[0].idt, self.nodes[1].idt]}, '
                 f'material={self.material.idt}, area={self.area}, layout_constraint={self.layout_constraint})')
 
-    def length(self)->float:
-        return  np.linalg.norm(np.array(self.nodes[0].position) - np.array(self.nodes[1].position))
+    def length(self) -> float:
+        if isinstance(self._columns, Structure):
+            return float(self._columns.lengths[self._index])
+        return float(np.linalg.norm(self.nodes[0].position - self.nodes[1].position))
 
     @classmethod
-    def read_dict(cls, dct: dict) -> Element:
+    def read_dict(cls, dct: dict, nodes: dict[int, Node] | None = None,
+                  materials: dict[int, Material] | None = None) -> Element:
+        """
+        Reads an element. When the nodes and materials are given (indexed by id), the element references
+        them by id and shares the existing objects. Otherwise, they are read from the nested dictionaries.
+        """
+        if nodes is None:
+            nodes_el = [Node.read_dict(node) for node in dct['nodes']]
+        else:
+            nodes_el = [nodes[idt] for idt in dct['nodes']]
+
+        if materials is None:
+            material = Material.read_dict(dct['material'])
+        else:
+            material = materials[dct['material']]
+
         return cls(idt=dct['idt'],
-                   nodes=[Node.read_dict(node) for node in dct['nodes']],
-                   material=Material.read_dict(dct['material']),
+                   nodes=nodes_el,
+                   material=material,
                    area=dct['area'],
                    layout_constraint=dct['layout_constraint'])
 
@@ -74,28 +237,227 @@ class Element(BaseData):
 
 
 class Structure(BaseData):
+    """
+    Truss structure stored in columns:
+
+    - node_ids (n_nodes,), positions (n_nodes, 2), forces (n_nodes, 2) and supports (n_nodes, 2) of bools;
+    - element_ids (n_elements,), connectivity (n_elements, 2) of 0-based node indices, areas (n_elements,),
+      material_index (n_elements,) of 0-based indices in materials and layout_constraints (n_elements,).
+
+    The objects in nodes and elements are views over these arrays, so changes made through them are seen by the
+    vectorized code and vice versa.
+
+    positions and connectivity are read-only arrays: they are changed by assigning new arrays, through the nodes and
+    elements views or with move_nodes, so that the cached elements geometry (lengths, cosines and sines) is
+    recomputed only when they change.
+    """
+
     def __init__(self, nodes: list[Node], elements: list[Element], materials: list[Material]):
-        self.nodes = nodes
-        self.elements = elements
-        self.materials = materials
+        self.materials = list(materials)
+
+        self.node_ids = np.array([node.idt for node in nodes], dtype=np.int64)
+        self.positions = np.array([node.position for node in nodes], dtype=float).reshape(-1, 2)
+        self.forces = np.array([node.force for node in nodes], dtype=float).reshape(-1, 2)
+        self.supports = np.array([node.support for node in nodes], dtype=bool).reshape(-1, 2)
+
+        nodes_index = {id(node): i for i, node in enumerate(nodes)}
+        ids_index = {node.idt: i for i, node in enumerate(nodes)}
+        materials_index = {id(material): i for i, material in enumerate(self.materials)}
+
+        connectivity = []
+        material_index = []
+        for element in elements:
+            connectivity.append([nodes_index[id(node)] if id(node) in nodes_index else ids_index[node.idt]
+                                 for node in element.nodes])
+            if (material := element.material) is not None and id(material) not in materials_index:
+                materials_index[id(material)] = len(self.materials)
+                self.materials.append(material)
+            material_index.append(materials_index[id(material)])
+
+        self.element_ids = np.array([element.idt for element in elements], dtype=np.int64)
+        self.connectivity = np.array(connectivity, dtype=np.int32).reshape(-1, 2)
+        self.areas = np.array([element.area for element in elements], dtype=float)
+        self.material_index = np.array(material_index, dtype=np.int32)
+        self.layout_constraints = np.array([element.layout_constraint for element in elements], dtype=np.int32)
+
+        # The given objects become views over the arrays of the structure
+        self.nodes = list(nodes)
+        for i, node in enumerate(self.nodes):
+            node._columns = self
+            node._index = i
+
+        self.elements = list(elements)
+        for i, element in enumerate(self.elements):
+            element._columns = self
+            element._index = i
+
+    @classmethod
+    def from_arrays(cls, positions: np.ndarray, connectivity: np.ndarray, materials: list[Material],
+                    areas: np.ndarray | float = 1.0, material_index: np.ndarray | None = None,
+                    layout_constraints: np.ndarray | None = None, forces: np.ndarray | None = None,
+                    supports: np.ndarray | None = None, node_ids: np.ndarray | None = None,
+                    element_ids: np.ndarray | None = None) -> Structure:
+        """
+        Creates a structure directly from its arrays, without building the nodes and elements one by one.
+        :param positions: nodal coordinates (n_nodes, 2)
+        :param connectivity: 0-based node indices of the elements (n_elements, 2)
+        :param materials: materials referenced by material_index
+        :param areas: elements areas (n_elements,) or a single value for all elements
+        :param material_index: 0-based index in materials of each element. Defaults to the first material.
+        :param layout_constraints: layout constraint of each element. Defaults to 0 (no constraint).
+        :param forces: nodal forces (n_nodes, 2). Defaults to zero.
+        :param supports: nodal supports (n_nodes, 2). Defaults to free nodes.
+        :param node_ids: nodes ids. Defaults to 1, 2, ..., n_nodes.
+        :param element_ids: elements ids. Defaults to 1, 2, ..., n_elements.
+        """
+        structure = cls.__new__(cls)
+        structure.materials = list(materials)
+
+        structure.positions = np.array(positions, dtype=float).reshape(-1, 2)
+        n_nodes = structure.positions.shape[0]
+        structure.connectivity = np.array(connectivity, dtype=np.int32).reshape(-1, 2)
+        n_elements = structure.connectivity.shape[0]
+
+        structure.node_ids = (np.arange(1, n_nodes + 1, dtype=np.int64) if node_ids is None
+                              else np.array(node_ids, dtype=np.int64))
+        structure.forces = np.zeros((n_nodes, 2)) if forces is None else np.array(forces, dtype=float)
+        structure.supports = (np.zeros((n_nodes, 2), dtype=bool) if supports is None
+                              else np.array(supports, dtype=bool))
+
+        structure.element_ids = (np.arange(1, n_elements + 1, dtype=np.int64) if element_ids is None
+                                 else np.array(element_ids, dtype=np.int64))
+        structure.areas = np.array(np.broadcast_to(np.asarray(areas, dtype=float), (n_elements,)))
+        structure.material_index = (np.zeros(n_elements, dtype=np.int32) if material_index is None
+                                    else np.array(material_index, dtype=np.int32))
+        structure.layout_constraints = (np.zeros(n_elements, dtype=np.int32) if layout_constraints is None
+                                        else np.array(layout_constraints, dtype=np.int32))
+
+        structure.nodes = [Node._view(structure, i) for i in range(n_nodes)]
+        structure.elements = [Element._view(structure, i) for i in range(n_elements)]
+        return structure
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions
+
+    @positions.setter
+    def positions(self, value: np.ndarray):
+        self._positions = np.array(value, dtype=float).reshape(-1, 2)
+        self._positions.flags.writeable = False
+        self._geometry = None
+
+    @property
+    def connectivity(self) -> np.ndarray:
+        return self._connectivity
+
+    @connectivity.setter
+    def connectivity(self, value: np.ndarray):
+        self._connectivity = np.array(value, dtype=np.int32).reshape(-1, 2)
+        self._connectivity.flags.writeable = False
+        self._geometry = None
+
+    def move_nodes(self, indices, positions: np.ndarray):
+        """
+        Changes the positions of the nodes at the given 0-based indices.
+        """
+        self._positions.flags.writeable = True
+        try:
+            self._positions[indices] = positions
+        finally:
+            self._positions.flags.writeable = False
+        self._geometry = None
+
+    def _set_position(self, index: int, value: list[float]):
+        self.move_nodes(index, value)
+
+    def _set_connectivity(self, index: int, value: list[int]):
+        self._connectivity.flags.writeable = True
+        try:
+            self._connectivity[index] = value
+        finally:
+            self._connectivity.flags.writeable = False
+        self._geometry = None
+
+    def _elements_geometry(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self._geometry is None:
+            delta = self._positions[self._connectivity[:, 1]] - self._positions[self._connectivity[:, 0]]
+            lengths = np.hypot(delta[:, 0], delta[:, 1])
+            cosines = delta[:, 0] / lengths
+            sines = delta[:, 1] / lengths
+            for array in (lengths, cosines, sines):
+                array.flags.writeable = False
+            self._geometry = (lengths, cosines, sines)
+        return self._geometry
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """
+        Elements lengths (n_elements,).
+        """
+        return self._elements_geometry()[0]
+
+    @property
+    def cosines(self) -> np.ndarray:
+        """
+        Cosines of the angles between the elements (from the first to the second node) and the x-axis.
+        """
+        return self._elements_geometry()[1]
+
+    @property
+    def sines(self) -> np.ndarray:
+        """
+        Sines of the angles between the elements (from the first to the second node) and the x-axis.
+        """
+        return self._elements_geometry()[2]
+
+    def segments(self) -> np.ndarray:
+        """
+        Coordinates of the elements ends (n_elements, 2, 2).
+        """
+        return self.positions[self.connectivity]
+
+    def youngs(self) -> np.ndarray:
+        """
+        Young's modulus of each element.
+        """
+        return np.array([material.young for material in self.materials], dtype=float)[self.material_index]
 
     @classmethod
     def read_dict(cls, dct: dict) -> type(BaseData):
-        nodes = [Node.read_dict(node) for node in dct['nodes']]
+        nodes = dct['nodes']
+        elements = dct['elements']
         materials = [Material.read_dict(material) for material in dct['materials']]
 
-        elements = []
-        for el in dct['elements']:
-            nodes_el = [node for node in nodes if node.idt in el['nodes']]
-            material_el = materials[el['material'] - 1]
-            elements.append(Element(idt=el['idt'],
-                                    nodes=nodes_el,
-                                    material=material_el,
-                                    area=el['area'],
-                                    layout_constraint=el['layout_constraint']))
-        return cls(nodes=nodes, elements=elements, materials=materials)
+        node_ids = np.array([node['idt'] for node in nodes], dtype=np.int64)
+        nodes_index = {idt: i for i, idt in enumerate(node_ids.tolist())}
+        materials_index = {material.idt: i for i, material in enumerate(materials)}
+
+        return cls.from_arrays(positions=[node['position'] for node in nodes],
+                               forces=[node['force'] for node in nodes],
+                               supports=[node['support'] for node in nodes],
+                               node_ids=node_ids,
+                               connectivity=[[nodes_index[idt] for idt in el['nodes']] for el in elements],
+                               materials=materials,
+                               material_index=[materials_index[el['material']] for el in elements],
+                               areas=[el['area'] for el in elements],
+                               layout_constraints=[el['layout_constraint'] for el in elements],
+                               element_ids=[el['idt'] for el in elements])
 
     def to_dict(self):
-        return {'nodes': [node.to_dict() for node in self.nodes],
-                'elements': [element.to_dict() for element in self.elements],
+        material_ids = [material.idt for material in self.materials]
+        node_ids = self.node_ids.tolist()
+
+        nodes = [{'idt': idt, 'position': position, 'force': force, 'support': support}
+                 for idt, position, force, support in zip(node_ids, self.positions.tolist(), self.forces.tolist(),
+                                                          self.supports.tolist())]
+
+        elements = [{'idt': idt, 'nodes': [node_ids[n1], node_ids[n2]], 'material': material_ids[material],
+                     'area': area, 'layout_constraint': lc}
+                    for idt, (n1, n2), material, area, lc in zip(self.element_ids.tolist(),
+                                                                 self.connectivity.tolist(),
+                                                                 self.material_index.tolist(), self.areas.tolist(),
+                                                                 self.layout_constraints.tolist())]
+
+        return {'nodes': nodes,
+                'elements': elements,
                 'materials': [material.to_dict() for material in self.materials]}
@@ -1,10 +1,16 @@
 import shapely as sp
 import numpy as np
 import ezdxf
-from itertools import combinations
 import loguru
 from tqdm import tqdm
 
+from data_handler.directions import nearest_along_directions
+
+# Distance below which elements are considered collinear
+COLLINEAR_TOLERANCE = 1e-6
+# Pairs of points checked at once
+PAIRS_BATCH_SIZE = 1 << 20
+
 
 class FlowerMesh:
     def __init__(self, filename, r1, r2, angular_div, radial_div):
@@ -66,27 +72,41 @@ class FlowerMesh:
         length2 = np.linalg.norm(p3 - p4)
 
         if length1 > length2:
-            line1 = sp.geometry.LineString([p1, p2]).buffer(1e-6)
+            line1 = sp.geometry.LineString([p1, p2]).buffer(COLLINEAR_TOLERANCE)
             line2 = sp.geometry.LineString([p3, p4])
         else:
-            line1 = sp.geometry.LineString([p3, p4]).buffer(1e-6)
+            line1 = sp.geometry.LineString([p3, p4]).buffer(COLLINEAR_TOLERANCE)
             line2 = sp.geometry.LineString([p1, p2])
 
         return line1.contains(line2)
 
+    def pairs(self, batch_size=PAIRS_BATCH_SIZE):
+        """
+        Yields the pairs of points (i < j) that do not pass through another point, in lexicographic order, in batches
+        of the rows i with about batch_size pairs (to all the other points) each
+        """
+        n = self.points.shape[0]
+        # Angle subtended by the collinearity tolerance at the largest distance between the points
+        tolerance = COLLINEAR_TOLERANCE / (2 * max(abs(self.r1), abs(self.r2)))
+        rows = max(1, batch_size // max(n - 1, 1))
+        for row in range(0, n - 1, rows):
+            i = np.repeat(np.arange(row, min(row + rows, n - 1)), n - 1)
+            j = np.tile(np.arange(n - 1), len(i) // (n - 1))
+            j += j >= i
+            visible = nearest_along_directions(self.points, i, j, tolerance) & (j > i)
+            yield i[visible], j[visible]
+
     def generate_elements(self):
         loguru.logger.info('Generating elements...')
 
-        for comb in tqdm(list(combinations(range(self.points.shape[0]), 2))):
-            i, j = comb
-            line = sp.geometry.LineString([self.points[i], self.points[j]])
+        sp.prepare(self.geometry)
+        elements = []
+        for i, j in tqdm(self.pairs(), desc='Checking containment'):
+            lines = sp.linestrings(np.stack([self.points[i], self.points[j]], axis=1))
+            inside = sp.contains(self.geometry, lines)
+            elements.append(np.column_stack([i[inside], j[inside]]).astype(np.int32))
 
-            for el in self.elements:
-                if self.verify_collinearity(comb, el):
-                    break
-            else:
-                if self.geometry.contains(line):
-                    self.elements.append(comb)
+        self.elements = np.concatenate(elements) if elements else np.zeros((0, 2), dtype=np.int32)
 
         loguru.logger.info(f'Generated {len(self.elements)} elements and {self.points.shape[0]} nodes.')
 
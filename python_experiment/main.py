@@ -1,20 +1,34 @@
+"""
+Compliance landscapes of structures with two design variables.
+
+Run from the repository root as a module, so that data_handler is importable: python -m python_experiment.main
+"""
 from matplotlib import pyplot as plt
 import numpy as np
-from math import sqrt, atan2, pi, cos, sin
+from math import pi, cos, sin
+from scipy.optimize import minimize
 import matplotlib
+import os
 import sys
 
-matplotlib.use('TkAgg')
+if 'MPLBACKEND' not in os.environ:
+    matplotlib.use('TkAgg')
+
+from data_handler import Modeller, Structure, GroupedCompliance
 
 plt.rcParams["font.family"] = "Times New Roman"
 plt.rcParams["font.size"] = 12
 
 
 def smooth_max(x, y, mu):
-    return (x + y + sqrt((x - y) ** 2 + mu ** 2)) / 2
+    return (x + y + np.sqrt((x - y) ** 2 + mu ** 2)) / 2
 
 
 class Example:
+    """
+    Compliance landscape of a structure with two design variables (x1, x2). The methods take scalars or arrays,
+    which are broadcast together, so a whole meshgrid is evaluated at once.
+    """
     # Design data
     ...
 
@@ -33,6 +47,12 @@ class Example:
     Y_PLOT_MIN = 3e-2
     Y_PLOT_MAX = 0.20
 
+    # Adaptive sampling data: cells of the initial grid per side, refinement levels and cells with the lowest
+    # compliances refined at each level (besides the cells crossed by the volume constraint boundary)
+    ADAPTIVE_CELLS = 16
+    ADAPTIVE_LEVELS = 8
+    ADAPTIVE_BEST_CELLS = 8
+
     xc_min = 0
     yc_min = 0
     c_min = 0
@@ -46,69 +66,172 @@ class Example:
     def txy(self, x1, x2) -> float:
         pass
 
-    def mu(self, x1, x2):
+    def tensor(self, x1, x2):
+        """
+        Components txx, tyy and txy of the compliance tensor, broadcast to the shape of x1 and x2.
+        """
+        x1, x2 = np.broadcast_arrays(np.asarray(x1, dtype=float), np.asarray(x2, dtype=float))
+        return tuple(np.broadcast_to(t, x1.shape) for t in (self.txx(x1, x2), self.tyy(x1, x2), self.txy(x1, x2)))
+
+    def _mu(self, txx, tyy):
+        # Fixed at the first evaluated design, as the optimizer fixes it at the initial design
         if np.isclose(self.MU, 0.0):
-            self.MU = self.BETA * (self.txx(x1, x2) + self.tyy(x1, x2)) / 2
+            self.MU = self.BETA * float(np.ravel(txx)[0] + np.ravel(tyy)[0]) / 2
         return self.MU
 
-    def c_theta(self, x1, x2, theta):
-        txx = self.txx(x1, x2)
-        tyy = self.tyy(x1, x2)
-        txy = self.txy(x1, x2)
+    def mu(self, x1, x2):
+        txx, tyy, _ = self.tensor(x1, x2)
+        return self._mu(txx, tyy)
 
+    @staticmethod
+    def _c_theta(txx, tyy, txy, theta):
         return (txx + tyy) / 2 + (txx - tyy) / 2 * np.cos(2 * theta) + txy * np.sin(2 * theta)
 
-    def thetas_lim(self, x1, x2):
-        txx = self.txx(x1, x2)
-        tyy = self.tyy(x1, x2)
-        txy = self.txy(x1, x2)
+    def c_theta(self, x1, x2, theta):
+        return self._c_theta(*self.tensor(x1, x2), theta)
 
-        theta_cr1 = atan2(2 * txy, txx - tyy) / 2
+    def _thetas_lim(self, txx, tyy, txy):
+        theta_cr1 = np.arctan2(2 * txy, txx - tyy) / 2
         theta_cr2 = theta_cr1 - np.sign(theta_cr1 + sys.float_info.epsilon) * pi / 2
 
-        t1 = min(max(theta_cr1, -self.THETA_R), self.THETA_R)
-        t2 = min(max(theta_cr2, -self.THETA_R), self.THETA_R)
+        t1 = np.clip(theta_cr1, -self.THETA_R, self.THETA_R)
+        t2 = np.clip(theta_cr2, -self.THETA_R, self.THETA_R)
 
         return t1, t2
 
-    def c_ef(self, x1, x2):
-        theta_1, theta_2 = self.thetas_lim(x1, x2)
-        c1 = self.c_theta(x1, x2, theta_1)
-        c2 = self.c_theta(x1, x2, theta_2)
+    def thetas_lim(self, x1, x2):
+        return self._thetas_lim(*self.tensor(x1, x2))
 
-        vc = self.volume_constraint(x1, x2)
+    def _c_max(self, x1, x2):
+        txx, tyy, txy = self.tensor(x1, x2)
+        theta_1, theta_2 = self._thetas_lim(txx, tyy, txy)
+        c1 = self._c_theta(txx, tyy, txy, theta_1)
+        c2 = self._c_theta(txx, tyy, txy, theta_2)
 
-        return smooth_max(c1, c2, self.mu(x1, x2)) if vc < 0 else np.nan
+        return smooth_max(c1, c2, self._mu(txx, tyy))
 
-    def volume_constraint(self, x1, x2) -> float:
-        pass
+    def c_ef(self, x1, x2):
+        """
+        Effective compliance, NaN where the volume constraint is violated.
+        """
+        vc = self.volume_constraint(x1, x2)
 
-    def plot_contour(self):
+        return np.where(vc < 0, self._c_max(x1, x2), np.nan)
+
+    def landscape(self):
+        """
+        Effective compliance on the plot grid and its minimum.
+        :return: x_mesh, y_mesh, z_mesh (N_POINTS, N_POINTS) and (x1, x2, c) of the minimum
+        """
         x = np.linspace(self.X_PLOT_MIN, self.X_PLOT_MAX, self.N_POINTS)
         y = np.linspace(self.Y_PLOT_MIN, self.Y_PLOT_MAX, self.N_POINTS)
 
         x_mesh, y_mesh = np.meshgrid(x, y)
-        z_mesh = np.zeros((self.N_POINTS, self.N_POINTS))
+        z_mesh = self.c_ef(x_mesh, y_mesh)
+
+        i_min = np.unravel_index(np.nanargmin(z_mesh), z_mesh.shape)
+        return x_mesh, y_mesh, z_mesh, (x_mesh[i_min], y_mesh[i_min], z_mesh[i_min])
+
+    def adaptive_landscape(self):
+        """
+        Effective compliance sampled on a quadtree. Starting from a coarse grid, the cells crossed by the volume
+        constraint boundary, the cells with the lowest compliances and their neighbours (so that narrow valleys
+        between the samples are kept) are split in four, ADAPTIVE_LEVELS times. The best sample is then polished
+        with SLSQP subject to the volume constraint, with the variables scaled to the plot limits and the objective
+        to the best sample.
+        :return: x, y, z of the (unique) samples and (x1, x2, c) of the minimum
+        """
+        # Corners and centre of a cell, relative to its origin and size
+        offsets_x = np.array([0.0, 1.0, 0.0, 1.0, 0.5])
+        offsets_y = np.array([0.0, 0.0, 1.0, 1.0, 0.5])
+        # Cell and its 8 neighbours
+        around_x, around_y = (a.ravel() for a in np.meshgrid([-1, 0, 1], [-1, 0, 1]))
+
+        n_cells = self.ADAPTIVE_CELLS
+        index_x, index_y = (i.ravel() for i in np.meshgrid(np.arange(n_cells), np.arange(n_cells)))
+
+        samples = []
+        for level in range(self.ADAPTIVE_LEVELS + 1):
+            size_x = (self.X_PLOT_MAX - self.X_PLOT_MIN) / n_cells
+            size_y = (self.Y_PLOT_MAX - self.Y_PLOT_MIN) / n_cells
+            x = self.X_PLOT_MIN + size_x * (index_x[:, None] + offsets_x)
+            y = self.Y_PLOT_MIN + size_y * (index_y[:, None] + offsets_y)
+            z = self.c_ef(x, y)
+            samples.append(np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1))
+
+            if level == self.ADAPTIVE_LEVELS:
+                break
+
+            feasible = ~np.isnan(z)
+            boundary = feasible.any(axis=1) & ~feasible.all(axis=1)
+            lowest = np.where(feasible, z, np.inf).min(axis=1)
+            best = np.argsort(lowest)[:self.ADAPTIVE_BEST_CELLS]
+            best = best[np.isfinite(lowest[best])]
+
+            refine_x = np.concatenate([index_x[boundary], (index_x[best, None] + around_x).ravel()])
+            refine_y = np.concatenate([index_y[boundary], (index_y[best, None] + around_y).ravel()])
+            inside = (refine_x >= 0) & (refine_x < n_cells) & (refine_y >= 0) & (refine_y < n_cells)
+            refine = np.unique(refine_x[inside] * n_cells + refine_y[inside])
+
+            n_cells *= 2
+            index_x = (2 * (refine[:, None] // (n_cells // 2)) + np.array([0, 1, 0, 1])).ravel()
+            index_y = (2 * (refine[:, None] % (n_cells // 2)) + np.array([0, 0, 1, 1])).ravel()
+
+        samples = np.unique(np.concatenate(samples), axis=0)
+        x, y, z = samples.T
+
+        i_min = np.nanargmin(z)
+        minimum = (x[i_min], y[i_min], z[i_min])
+
+        # Scaled to the order of one: the areas are small and the compliances large, which stalls the solver
+        origin = np.array([self.X_PLOT_MIN, self.Y_PLOT_MIN])
+        span = np.array([self.X_PLOT_MAX, self.Y_PLOT_MAX]) - origin
+
+        def objective(u):
+            return float(self._c_max(*(origin + span * u))) / minimum[2]
+
+        def constraint(u):
+            return -float(self.volume_constraint(*(origin + span * u))) / self.V
+
+        result = minimize(objective, (np.array(minimum[:2]) - origin) / span, method='SLSQP',
+                          bounds=[(0.0, 1.0), (0.0, 1.0)], constraints=[{'type': 'ineq', 'fun': constraint}],
+                          options={'ftol': 1e-14})
+        # The objective is not smooth (the critical angles are clipped), so SLSQP may stop at a better point
+        # without reporting success. Any improvement that is feasible for c_ef (vc < 0) is taken; a point on the
+        # boundary is pulled back towards the best sample until it is.
+        best = np.array(minimum[:2])
+        for fraction in 1 - np.logspace(-15, 0, 16):
+            x_min = best + fraction * (origin + span * result.x - best)
+            c_min = float(self.c_ef(*x_min))
+            if not np.isnan(c_min):
+                break
+        if c_min < minimum[2]:
+            minimum = (x_min[0], x_min[1], c_min)
+
+        return x, y, z, minimum
 
-        x1_z_min = 0
-        x2_z_min = 0
-        z_min = np.inf
+    def volume_constraint(self, x1, x2) -> float:
+        pass
 
+    def plot_contour(self, adaptive: bool = False):
+        """
+        :param adaptive: when True, the landscape is sampled with adaptive_landscape instead of the uniform grid
+        """
         fig, ax = plt.subplots()
 
-        for i in range(self.N_POINTS):
-            for j in range(self.N_POINTS):
-                z_mesh[i, j] = self.c_ef(x_mesh[i, j], y_mesh[i, j])
-                if z_mesh[i, j] is not np.nan:
-                    if z_mesh[i, j] < z_min:
-                        z_min = z_mesh[i, j]
-                        x1_z_min = x_mesh[i, j]
-                        x2_z_min = y_mesh[i, j]
-
-        ax.contour(x_mesh, y_mesh, z_mesh, self.N_CONTOURS, linewidths=0.4, linestyles='solid', colors='k')
-        cont = ax.contourf(x_mesh, y_mesh, z_mesh, self.N_CONTOURS, cmap='jet')
+        if adaptive:
+            x, y, z, (x1_z_min, x2_z_min, z_min) = self.adaptive_landscape()
+            feasible = ~np.isnan(z)
+            x, y, z = x[feasible], y[feasible], z[feasible]
+            ax.tricontour(x, y, z, self.N_CONTOURS, linewidths=0.4, linestyles='solid', colors='k')
+            cont = ax.tricontourf(x, y, z, self.N_CONTOURS, cmap='jet')
+        else:
+            x_mesh, y_mesh, z_mesh, (x1_z_min, x2_z_min, z_min) = self.landscape()
+            ax.contour(x_mesh, y_mesh, z_mesh, self.N_CONTOURS, linewidths=0.4, linestyles='solid', colors='k')
+            cont = ax.contourf(x_mesh, y_mesh, z_mesh, self.N_CONTOURS, cmap='jet')
+
         ax.scatter(x1_z_min, x2_z_min, marker='o', color='orange', s=40, edgecolors='k', linewidths=0.5,
-                   label=f'Cmin: {np.nanmin(z_mesh):.2f}')
+                   label=f'Cmin: {z_min:.2f}')
 
         print(f'txx: {self.txx(x1_z_min, x2_z_min)}\n'
               f'tyy: {self.tyy(x1_z_min, x2_z_min)}\n'
@@ -116,7 +239,7 @@ class Example:
 
         self.xc_min = x1_z_min
         self.yc_min = x2_z_min
-        self.c_min = np.nanmin(z_mesh)
+        self.c_min = z_min
 
         plt.colorbar(cont, label='Compliance')
         plt.xlabel('x1')
@@ -135,8 +258,7 @@ class Example:
 
     def plot_2d(self):
         x = np.linspace(0.010768, 0.01077, self.N_POINTS ** 2)
-        y_func = np.vectorize(self.c_ef)
-        y = y_func(x, 0.035)
+        y = self.c_ef(x, 0.035)
 
         plt.plot(x, y)
         plt.show()
@@ -144,6 +266,49 @@ class Example:
         plt.ylabel('Compliance')
 
 
+class StructureExample(Example):
+    """
+    Landscape of a small structure with two groups of elements (by default the layout constraints 1 and 2) whose
+    areas are x1 and x2. The tensors are computed by GroupedCompliance, so no closed-form expressions are needed.
+    The plot limits go up to the areas that use the whole volume in a single group.
+    """
+
+    def __init__(self, structure: Structure, groups: np.ndarray | None = None, group_ids: tuple[int, int] = (1, 2),
+                 volume: float | None = None):
+        self.compliance = GroupedCompliance(structure, groups, group_ids)
+        if volume is not None:
+            self.V = volume
+
+        free_volume = self.V - self.compliance.fixed_volume
+        self.X_PLOT_MAX = free_volume / self.compliance.group_lengths[0]
+        self.Y_PLOT_MAX = free_volume / self.compliance.group_lengths[1]
+        self.X_PLOT_MIN = 0.05 * self.X_PLOT_MAX
+        self.Y_PLOT_MIN = 0.05 * self.Y_PLOT_MAX
+
+    @classmethod
+    def read(cls, filename: str, groups: np.ndarray | None = None, group_ids: tuple[int, int] = (1, 2)):
+        """
+        Landscape of the structure of a json case, with its maximum volume.
+        """
+        modeller = Modeller.read(filename)
+        return cls(modeller.structure, groups, group_ids, modeller.optimizer.volume_max)
+
+    def tensor(self, x1, x2):
+        return self.compliance.tensors(x1, x2)
+
+    def txx(self, x1, x2):
+        return self.tensor(x1, x2)[0]
+
+    def tyy(self, x1, x2):
+        return self.tensor(x1, x2)[1]
+
+    def txy(self, x1, x2):
+        return self.tensor(x1, x2)[2]
+
+    def volume_constraint(self, x1, x2):
+        return self.compliance.volumes(x1, x2) - self.V
+
+
 class Cross(Example):
     # Design data
     L1 = 2
@@ -173,7 +338,7 @@ class Cross(Example):
         return self.F2 ** 2 * self.L2 / (2 * self.E * x2)
 
     def txy(self, x1, x2):
-        return 0
+        return np.zeros_like(x1)
 
     def volume_constraint(self, x1, x2):
         return 2 * (x1 * self.L1 + x2 * self.L2) - self.V
@@ -183,8 +348,8 @@ class Example2(Example):
     # Design data
     L1 = 21.54065923
     L2 = 20.09975124
-    PHI_1 = atan2(-2 - (-10), 20 - 0)
-    PHI_2 = atan2(-2, 20)
+    PHI_1 = np.arctan2(-2 - (-10), 20 - 0)
+    PHI_2 = np.arctan2(-2, 20)
 
     # Optimization data
     V = 1
@@ -200,37 +365,40 @@ class Example2(Example):
     Y_PLOT_MIN = 0.005
     Y_PLOT_MAX = 0.04
 
+    def stiffness(self, x1, x2):
+        """
+        Components kxx, kyy and kxy of the stiffness matrix of the loaded node.
+        """
+        c1, s1 = cos(self.PHI_1), sin(self.PHI_1)
+        c2, s2 = cos(self.PHI_2), sin(self.PHI_2)
+        return (x1 * c1 ** 2 / self.L1 + x2 * c2 ** 2 / self.L2,
+                x1 * s1 ** 2 / self.L1 + x2 * s2 ** 2 / self.L2,
+                x1 * c1 * s1 / self.L1 + x2 * c2 * s2 / self.L2)
+
+    def tensor(self, x1, x2):
+        # The compliance tensor is the inverse of the 2x2 stiffness matrix
+        x1, x2 = np.broadcast_arrays(np.asarray(x1, dtype=float), np.asarray(x2, dtype=float))
+        kxx, kyy, kxy = self.stiffness(x1, x2)
+        det = kxx * kyy - kxy ** 2
+        return kyy / det, kxx / det, -kxy / det
+
     def txx(self, x1, x2):
-        return 1 / (x1 * cos(self.PHI_1) ** 2 / self.L1 + x2 * cos(self.PHI_2) ** 2 / self.L2) + (
-                x1 * cos(self.PHI_1) * sin(self.PHI_1) / self.L1 + x2 * cos(self.PHI_2) * sin(
-            self.PHI_2) / self.L2) ** 2 / (
-                (x1 * cos(self.PHI_1) ** 2 / self.L1 + x2 * cos(self.PHI_2) ** 2 / self.L2) ** 2 * (
-                x1 * sin(self.PHI_1) ** 2 / self.L1 + x2 * sin(self.PHI_2) ** 2 / self.L2 - (
-                x1 * cos(self.PHI_1) * sin(self.PHI_1) / self.L1 + x2 * cos(self.PHI_2) * sin(
-            self.PHI_2) / self.L2) ** 2 / (
-                        x1 * cos(self.PHI_1) ** 2 / self.L1 + x2 * cos(self.PHI_2) ** 2 / self.L2)))
+        return self.tensor(x1, x2)[0]
 
     def tyy(self, x1, x2):
-        return 1 / (x1 * sin(self.PHI_1) ** 2 / self.L1 + x2 * sin(self.PHI_2) ** 2 / self.L2 - (
-                x1 * cos(self.PHI_1) * sin(self.PHI_1) / self.L1 + x2 * cos(self.PHI_2) * sin(
-            self.PHI_2) / self.L2) ** 2 / (
-                            x1 * cos(self.PHI_1) ** 2 / self.L1 + x2 * cos(self.PHI_2) ** 2 / self.L2))
+        return self.tensor(x1, x2)[1]
 
     def txy(self, x1, x2):
-        return -(x1 * cos(self.PHI_1) * sin(self.PHI_1) / self.L1 + x2 * cos(self.PHI_2) * sin(
-            self.PHI_2) / self.L2) / ((x1 * cos(self.PHI_1) ** 2 / self.L1 + x2 * cos(self.PHI_2) ** 2 / self.L2) * (
-                x1 * sin(self.PHI_1) ** 2 / self.L1 + x2 * sin(self.PHI_2) ** 2 / self.L2 - (
-                x1 * cos(self.PHI_1) * sin(self.PHI_1) / self.L1 + x2 * cos(self.PHI_2) * sin(
-            self.PHI_2) / self.L2) ** 2 / (
-                        x1 * cos(self.PHI_1) ** 2 / self.L1 + x2 * cos(self.PHI_2) ** 2 / self.L2)))
+        return self.tensor(x1, x2)[2]
 
     def volume_constraint(self, x1, x2):
         return x1 * self.L1 + x2 * self.L2 - self.V
 
 
-ex = Example2()
-ex.BETA = 0.1
-ex.N_CONTOURS = 30
-ex.THETA_R = pi / 12
-ex.plot_contour()
-ex.plot_2d()
+if __name__ == '__main__':
+    ex = Example2()
+    ex.BETA = 0.1
+    ex.N_CONTOURS = 30
+    ex.THETA_R = pi / 12
+    ex.plot_contour()
+    ex.plot_2d()
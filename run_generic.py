@@ -1,7 +1,7 @@
-import os
 import sys
 from math import pi
 from data_handler import Modeller, SaveData, Optimizer, Material, CompliancePNorm, ComplianceSmoothTheta, ComplianceMu
+from data_handler import CaseRunner, ResultCache, DxfCache
 import numpy as np
 
 # ================================ Defining case ================================
@@ -10,49 +10,46 @@ import numpy as np
 #filename = files[0]
 #filename = sys.argv[1]
 
-def run(filename):
-    optimize = True
+def write_case(filename):
     # ================================ Create json file ================================
-    if optimize:
-        save_data = SaveData(step=1,
-                                save_angles=True,
-                                save_areas=False,
-                                save_forces=False,
-                                save_compliance=True,
-                                save_move=False,
-                                save_volume=False,
-                                save_error=False)
-        
-        #comp = ComplianceMu(0.5)
-        comp = ComplianceSmoothTheta(theta_r=pi/15, beta=0.1)
-
-        optimizer_data = Optimizer(compliance=comp,
-                                    volume_max=1.0,
-                                    min_iterations=2,
-                                    max_iterations=1000,
-                                    use_adaptive_move=False,
-                                    initial_move_multiplier=0.1,
-                                    use_adaptive_damping=False,
-                                    initial_damping=0.1,
-                                    use_layout_constraint=False,
-                                    x_min=1e-12,
-                                    tolerance=1e-8)
-
-
-        modeller = Modeller(filename=filename,
-                            data_to_save=save_data,
-                            optimizer=optimizer_data)
-
-        material = Material(1, 1.0)
-
-        modeller.read_structure_from_dxf(elements_material=material, elements_area=1e-5)
-
-        # modeller.write_dxf()
-        modeller.write_json()
-
-        # ================================ Run Julia optimization ================================
-        os.system(f'julia main.jl {modeller.filename}')
-
+    save_data = SaveData(step=1,
+                            save_angles=True,
+                            save_areas=False,
+                            save_forces=False,
+                            save_compliance=True,
+                            save_move=False,
+                            save_volume=False,
+                            save_error=False)
+    
+    #comp = ComplianceMu(0.5)
+    comp = ComplianceSmoothTheta(theta_r=pi/15, beta=0.1)
+
+    optimizer_data = Optimizer(compliance=comp,
+                                volume_max=1.0,
+                                min_iterations=2,
+                                max_iterations=1000,
+                                use_adaptive_move=False,
+                                initial_move_multiplier=0.1,
+                                use_adaptive_damping=False,
+                                initial_damping=0.1,
+                                use_layout_constraint=False,
+                                x_min=1e-12,
+                                tolerance=1e-8)
+
+
+    modeller = Modeller(filename=filename,
+                        data_to_save=save_data,
+                        optimizer=optimizer_data)
+
+    material = Material(1, 1.0)
+
+    modeller.read_structure_from_dxf(elements_material=material, elements_area=1e-5, cache=DxfCache())
+
+    # modeller.write_dxf()
+    modeller.write_json()
+
+
+def plot_results(filename):
     # ================================ Read optimized structure ================================
     markers_sizes = 0.05
     markers_width = 2
@@ -81,4 +78,19 @@ def run(filename):
 
     modeller.plot_compliance()
 
-run('cross.json')
+
+def run(filename):
+    optimize = True
+    if optimize:
+        write_case(filename)
+
+        # ================================ Run Julia optimization ================================
+        # Cases already optimized with the same structure and settings are copied from the cache
+        with CaseRunner(max_workers=1, cache=ResultCache()) as runner:
+            print(runner.run([filename])[0])
+
+    plot_results(filename)
+
+
+if __name__ == '__main__':
+    run('cross.json')
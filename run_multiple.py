@@ -1,4 +1,6 @@
-from run_generic import run
+from run_generic import write_case
+from data_handler import CaseRunner, ResultCache
+from data_handler.batch_render import render_results
 
 files1 = ['flower_1-1_1.json',
           'flower_1-025_1.json',
@@ -18,5 +20,16 @@ files2 = ['flower_2-1_1.json',
 
 files = files1 + files2
 
-for file in files:
-    run(file)
+if __name__ == '__main__':
+    for file in files:
+        write_case(file)
+
+    # ================================ Run Julia optimizations in parallel ================================
+    with CaseRunner(max_workers=None, timeout=None, cache=ResultCache()) as runner:
+        results = runner.run(files)
+
+    for result in results:
+        print(result)
+
+    # ================================ Render results without display ================================
+    render_results([result.filename for result in results if result.ok])
@@ -175,7 +175,7 @@ function generate_optimizer(filename::String)::Optimizer
             β=comp_file["parameters"]["beta"])
     end
 
-    return Optimizer(comp,
+    opt = Optimizer(comp,
         filename,
         volume_max=data["optimizer"]["volume_max"],
         initial_move_parameter=data["optimizer"]["initial_move_multiplier"],
@@ -187,6 +187,15 @@ function generate_optimizer(filename::String)::Optimizer
         damping=data["optimizer"]["initial_damping"],
         use_adaptive_damping=data["optimizer"]["use_adaptive_damping"],
         layout_constraint=layout_constraints)
+
+    # Starts from the given areas, scaled to the maximum volume
+    if get(data["optimizer"], "warm_start", false)
+        els_len = [len(el) for el in elements]
+        x = max.([el.area for el in elements], opt.x_min)
+        opt.x_k = x * (opt.volume_max / sum(x .* els_len))
+    end
+
+    return opt
 end
 
 function consider_layout_constraint!(opt::Optimizer)
@@ -368,6 +377,19 @@ function add_output_data(opt::Optimizer)
         catch
             opt.output[iterations] = [it_dict]
         end
+
+        append_log(opt, it_dict)
+    end
+end
+
+# Append-only log of the saved iterations (case.json -> case.log.jsonl), one json object per line. The file is
+# closed after each line, so a crashed run keeps its history and Python can follow a running one. The first line
+# identifies the run, so a reader can tell a log started again by a new run.
+log_filename(opt::Optimizer) = replace(opt.filename, r"\.json$" => "") * ".log.jsonl"
+
+function append_log(opt::Optimizer, record::Dict{String,Any})
+    open(log_filename(opt), "a") do io
+        println(io, JSON.json(record))
     end
 end
 
@@ -376,6 +398,10 @@ function optimize!(opt::Optimizer)
     error = Inf
     opt.iter = 1
     set_areas(opt)
+    # Starts a new log
+    open(log_filename(opt), "w") do io
+        println(io, JSON.json(Dict{String,Any}("run" => "$(time())-$(getpid())")))
+    end
 
     while error > opt.tol && opt.iter < opt.max_iters
         if opt.layout_constraint_divisions ≥ 1 #&& opt.iter % 500 == 0 && opt.iter > 0
@@ -414,6 +440,8 @@ function optimize!(opt::Optimizer)
         JSON.print(io, opt.output)
     end
 
+    append_log(opt, Dict{String,Any}("finished" => true, "idt" => opt.iter))
+
     @info "================== Optimization finished =================="
 
     output_summary(opt)
@@ -2,4 +2,5 @@ using Test
 
 include("test_fea/test_fea.jl")
 include("test_otm/test_otm.jl")
+include("test_worker/test_worker.jl")
 
@@ -0,0 +1,42 @@
+using Test, JSON
+
+# Smoke test of worker.jl: starts it as a process and sends a file request and a request that fails
+@testset verbose=true "Worker" begin
+    root = joinpath(@__DIR__, "..", "..")
+    folder = mktempdir()
+    filename = joinpath(folder, "example.json")
+    cp(joinpath(root, "example.json"), filename)
+
+    case = JSON.parsefile(filename)
+    case["optimizer"]["max_iterations"] = 10
+    open(filename, "w") do io
+        JSON.print(io, case)
+    end
+
+    cmd = `$(Base.julia_cmd()) --project=$(root) $(joinpath(root, "worker.jl"))`
+    process = open(pipeline(cmd, stderr=devnull), "r+")
+    try
+        @test JSON.parse(readline(process))["status"] == "ready"
+
+        println(process, JSON.json(Dict("id" => 1, "filename" => filename)))
+        message = JSON.parse(readline(process))
+        @test message["status"] == "ok"
+        @test message["id"] == 1
+        @test message["filename"] == filename
+        @test haskey(JSON.parsefile(filename), "last_iteration")
+
+        println(process, JSON.json(Dict("id" => 2, "filename" => joinpath(folder, "missing.json"))))
+        message = JSON.parse(readline(process))
+        @test message["status"] == "error"
+        @test message["id"] == 2
+        @test !isempty(message["message"])
+
+        println(process, "{")
+        message = JSON.parse(readline(process))
+        @test message["status"] == "error"
+        @test message["id"] === nothing
+    finally
+        close(process.in)
+        wait(process)
+    end
+end
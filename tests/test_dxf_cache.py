@@ -0,0 +1,91 @@
+import os
+
+import ezdxf
+import numpy as np
+import pytest
+
+from data_handler import DxfCache, Modeller, SaveData, Optimizer, ComplianceNominal, Material
+
+
+def write_dxf(filename, end=(1.0, 1.0)):
+    doc = ezdxf.new()
+    doc.layers.add('elements_default')
+    doc.layers.add('elements_lc_2')
+    doc.layers.add('nodes_0.0_-1.0_False_False')
+    doc.layers.add('nodes_0_0_True_True')
+    msp = doc.modelspace()
+    msp.add_line((0.0, 0.0), (1.0, 0.0), dxfattribs={'layer': 'elements_default'})
+    msp.add_line((1.0, 0.0), end, dxfattribs={'layer': 'elements_lc_2'})
+    msp.add_point(end, dxfattribs={'layer': 'nodes_0.0_-1.0_False_False'})
+    msp.add_point((0.0, 0.0), dxfattribs={'layer': 'nodes_0_0_True_True'})
+    doc.saveas(filename)
+    return str(filename)
+
+
+def assert_arrays_equal(arrays, expected):
+    assert set(arrays) == set(DxfCache.ARRAYS)
+    for key in DxfCache.ARRAYS:
+        np.testing.assert_array_equal(arrays[key], expected[key])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DxfCache(str(tmp_path / 'cache'))
+
+
+@pytest.fixture
+def filename(tmp_path):
+    return write_dxf(tmp_path / 'case.dxf')
+
+
+def test_put_and_get(cache, filename):
+    arrays = Modeller.parse_dxf(filename)
+    assert cache.get(filename) is None
+    cache.put(filename, 0.0, arrays)
+    assert_arrays_equal(cache.get(filename), arrays)
+    assert cache.get(filename, tolerance=1e-3) is None
+
+
+def test_touched_file(cache, filename):
+    arrays = Modeller.parse_dxf(filename)
+    cache.put(filename, 0.0, arrays)
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert_arrays_equal(cache.get(filename), arrays)
+    with np.load(cache.path(filename, 0.0)) as data:
+        assert data['mtime'] == os.stat(filename).st_mtime_ns
+
+
+def test_modified_file(cache, filename):
+    cache.put(filename, 0.0, Modeller.parse_dxf(filename))
+    mtime = os.stat(filename).st_mtime_ns
+    # Same size, other content and a later mtime
+    write_dxf(filename, end=(2.0, 1.0))
+    os.utime(filename, ns=(mtime, mtime + 10 ** 9))
+    assert cache.get(filename) is None
+
+
+def test_corrupt_entry(cache, filename):
+    cache.put(filename, 0.0, Modeller.parse_dxf(filename))
+    with open(cache.path(filename, 0.0), 'wb') as file:
+        file.write(b'not a npz file')
+    assert cache.get(filename) is None
+
+
+def test_read_structure_from_dxf(cache, tmp_path):
+    modeller = Modeller(filename=str(tmp_path / 'case.json'), data_to_save=SaveData(),
+                        optimizer=Optimizer(compliance=ComplianceNominal()))
+    filename = write_dxf(tmp_path / 'case.dxf')
+    modeller.read_structure_from_dxf(Material(1, 1.0), cache=cache)
+    parsed = modeller.structure
+    assert cache.get(filename) is not None
+
+    # The cached arrays are used while the file is unchanged
+    arrays = cache.get(filename)
+    arrays['positions'] = arrays['positions'] * 2
+    cache.put(filename, 0.0, arrays)
+    modeller.read_structure_from_dxf(Material(1, 1.0), cache=cache)
+    np.testing.assert_array_equal(modeller.structure.positions, parsed.positions * 2)
+    assert modeller.structure.layout_constraints.tolist() == parsed.layout_constraints.tolist() == [0, 2]
+    assert modeller.structure.forces.tolist() == parsed.forces.tolist()
@@ -0,0 +1,89 @@
+import ezdxf
+import numpy as np
+import pytest
+
+from data_handler import Modeller, SaveData, Optimizer, ComplianceNominal, Material, Structure
+from data_handler.dxf_writer import DXF_APPID, lineweights
+from data_handler.results import LastIteration, Iteration
+
+
+@pytest.fixture
+def modeller(tmp_path):
+    # 3 x 2 grid of nodes with horizontal, vertical and diagonal elements
+    positions = np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [0.0, 1.0], [1.0, 1.0], [2.0, 1.0]])
+    connectivity = np.array([[0, 1], [1, 2], [3, 4], [4, 5], [0, 3], [1, 4], [2, 5], [0, 4], [4, 2]])
+    forces = np.zeros((6, 2))
+    forces[5] = [0.5, -1.0]
+    forces[4] = [0.0, -2.0]
+    supports = np.zeros((6, 2), dtype=bool)
+    supports[0] = True
+    supports[3, 0] = True
+
+    modeller = Modeller(filename=str(tmp_path / 'case.json'), data_to_save=SaveData(),
+                        optimizer=Optimizer(compliance=ComplianceNominal()))
+    modeller.structure = Structure.from_arrays(positions=positions, connectivity=connectivity,
+                                               materials=[Material(1, 1.0)], areas=1.0,
+                                               layout_constraints=np.array([0, 0, 0, 0, 1, 1, 1, 2, 2]),
+                                               forces=forces, supports=supports)
+    return modeller
+
+
+def elements_of(positions, connectivity, layout_constraints):
+    return {(frozenset(map(tuple, positions[element].tolist())), lc)
+            for element, lc in zip(connectivity, layout_constraints.tolist())}
+
+
+def audit(filename):
+    doc = ezdxf.readfile(filename)
+    auditor = doc.audit()
+    assert not auditor.has_errors
+    return doc
+
+
+def test_round_trip(modeller, tmp_path):
+    modeller.write_dxf()
+    audit(str(tmp_path / 'case.dxf'))
+
+    structure = modeller.structure
+    modeller.read_structure_from_dxf(Material(1, 1.0))
+    read = modeller.structure
+
+    assert elements_of(read.positions, read.connectivity, read.layout_constraints) == \
+        elements_of(structure.positions, structure.connectivity, structure.layout_constraints)
+    # Same nodes, in any order
+    order = np.lexsort(read.positions.T[::-1])
+    expected = np.lexsort(structure.positions.T[::-1])
+    np.testing.assert_array_equal(read.positions[order], structure.positions[expected])
+    np.testing.assert_array_equal(read.forces[order], structure.forces[expected])
+    np.testing.assert_array_equal(read.supports[order], structure.supports[expected])
+
+
+def test_optimized(modeller, tmp_path):
+    areas = np.array([1.0, 0.5, 1e-6, 0.25, 0.0, 2.0, 1e-2, 0.1, 1e-5])
+    modeller.last_iteration = LastIteration(Iteration(1, areas=areas.tolist()))
+    modeller.write_dxf(optimized=True, cutoff=1e-3)
+
+    doc = audit(str(tmp_path / 'case_optimized.dxf'))
+    lines = doc.modelspace().query('LINE')
+    visible = areas > 1e-3 * areas.max()
+    assert len(lines) == visible.sum()
+
+    structure = modeller.structure
+    written = {frozenset([tuple(line.dxf.start)[:2], tuple(line.dxf.end)[:2]]):
+               (line.get_xdata(DXF_APPID)[0].value, line.dxf.lineweight) for line in lines}
+    weights = lineweights(areas[visible])
+    for element, area, weight in zip(structure.connectivity[visible], areas[visible], weights):
+        assert written[frozenset(map(tuple, structure.positions[element].tolist()))] == (area, weight)
+
+
+@pytest.mark.parametrize('areas', [None, [0.0] * 9])
+def test_optimized_without_areas(modeller, areas):
+    if areas is not None:
+        modeller.last_iteration = LastIteration(Iteration(1, areas=areas))
+    with pytest.raises(ValueError, match='case'):
+        modeller.write_dxf(optimized=True)
+
+
+def test_lineweights():
+    weights = lineweights(np.array([1.0, 0.25, 1e-8]), max_lineweight=100)
+    assert weights.tolist() == [100, 50, 5]
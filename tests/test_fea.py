@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from data_handler import Structure, Material, TrussSolver
+from data_handler.fea import analyse, stiffness_matrix
+
+
+@pytest.fixture
+def structure():
+    # 4 x 3 grid of nodes with all the members between neighbours (diagonals included), two materials
+    x, y = np.meshgrid(np.arange(4.0), np.arange(3.0))
+    positions = np.column_stack([x.ravel(), y.ravel()])
+    connectivity = np.array([[i, j] for i in range(12) for j in range(i + 1, 12)
+                             if np.abs(positions[i] - positions[j]).max() == 1.0])
+    rng = np.random.default_rng(0)
+    forces = np.zeros((12, 2))
+    forces[3] = [0.0, -1.0]
+    forces[11] = [0.5, -2.0]
+    supports = np.zeros((12, 2), dtype=bool)
+    supports[0] = True
+    supports[8, 0] = True
+    return Structure.from_arrays(positions=positions, connectivity=connectivity,
+                                 materials=[Material(1, 200.0), Material(2, 70.0)],
+                                 areas=rng.uniform(0.5, 2.0, len(connectivity)),
+                                 material_index=rng.integers(0, 2, len(connectivity)),
+                                 forces=forces, supports=supports)
+
+
+def dense_solution(structure, areas, forces):
+    """
+    Displacements from the dense stiffness matrix assembled element by element.
+    """
+    n_dofs = 2 * len(structure.positions)
+    stiffness = np.zeros((n_dofs, n_dofs))
+    youngs = structure.youngs()
+    for e, (i, j) in enumerate(structure.connectivity):
+        delta = structure.positions[j] - structure.positions[i]
+        length = np.linalg.norm(delta)
+        b = np.concatenate([-delta, delta]) / length
+        dofs = [2 * i, 2 * i + 1, 2 * j, 2 * j + 1]
+        stiffness[np.ix_(dofs, dofs)] += youngs[e] * areas[e] / length * np.outer(b, b)
+
+    free = ~structure.supports.reshape(-1)
+    displacements = np.zeros(n_dofs)
+    displacements[free] = np.linalg.solve(stiffness[np.ix_(free, free)], forces.reshape(-1)[free])
+    return stiffness, displacements.reshape(-1, 2)
+
+
+def test_against_dense_solution(structure):
+    stiffness, displacements = dense_solution(structure, structure.areas, structure.forces)
+    np.testing.assert_allclose(stiffness_matrix(structure).toarray(), stiffness, atol=1e-12)
+
+    analysis = analyse(structure)
+    np.testing.assert_allclose(analysis.displacements, displacements, rtol=1e-10, atol=1e-14)
+    assert analysis.compliance == pytest.approx(structure.forces.reshape(-1) @ displacements.reshape(-1))
+
+    delta = displacements[structure.connectivity[:, 1]] - displacements[structure.connectivity[:, 0]]
+    directions = np.column_stack([structure.cosines, structure.sines])
+    strains = np.einsum('ij,ij->i', delta, directions) / structure.lengths
+    np.testing.assert_allclose(analysis.strains, strains, rtol=1e-9, atol=1e-14)
+    np.testing.assert_allclose(analysis.forces, strains * structure.youngs() * structure.areas, rtol=1e-9,
+                               atol=1e-12)
+
+
+def test_load_cases_and_areas(structure):
+    rng = np.random.default_rng(1)
+    areas = rng.uniform(0.1, 1.0, len(structure.elements))
+    forces = rng.normal(size=(3, 12, 2))
+    forces[:, structure.supports] = 0.0
+
+    solver = TrussSolver(structure, areas)
+    analysis = solver.solve(forces)
+    assert analysis.displacements.shape == (3, 12, 2)
+    assert analysis.compliance.shape == (3,)
+    for case in range(3):
+        _, displacements = dense_solution(structure, areas, forces[case])
+        np.testing.assert_allclose(analysis.displacements[case], displacements, rtol=1e-10, atol=1e-14)
+        assert solver.solve(forces[case]).compliance == pytest.approx(analysis.compliance[case])
+
+
+def test_nodes_without_stiffness(structure):
+    # The members of node 7 have no area: its degrees of freedom are eliminated
+    areas = structure.areas.copy()
+    areas[(structure.connectivity == 7).any(axis=1)] = 0.0
+    analysis = analyse(structure, areas)
+    assert not analysis.displacements[7].any()
+
+    forces = structure.forces.copy()
+    forces[7] = [1.0, 0.0]
+    with pytest.raises(ValueError, match='without stiffness'):
+        analyse(structure, areas, forces)
+
+
+def test_mechanism():
+    # Square without diagonals, free to shear
+    structure = Structure.from_arrays(positions=[[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]],
+                                      connectivity=[[0, 1], [1, 2], [2, 3], [3, 0]], materials=[Material(1, 1.0)],
+                                      supports=[[True, True], [False, True], [False, False], [False, False]])
+    with pytest.raises(ValueError, match='mechanism'):
+        TrussSolver(structure)
@@ -0,0 +1,77 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from data_handler import IterationsStore
+from data_handler.results import ResultIterations
+
+
+def write_case(filename, n_iterations, n_elements=4):
+    rng = np.random.default_rng(n_iterations)
+    iterations = [{'idt': 10 * (i + 1),
+                   'areas': rng.random(n_elements).tolist(),
+                   'compliance': float(rng.random()),
+                   'volume': 1.0,
+                   'forces': [0.0, -1.0]} for i in range(n_iterations)]
+    with open(filename, 'w') as file:
+        json.dump({'save_data': {'step': 10}, 'iterations': iterations, 'last_iteration': iterations[-1]}, file)
+    return iterations
+
+
+@pytest.fixture
+def case(tmp_path):
+    filename = str(tmp_path / 'case.json')
+    return filename, write_case(filename, 5)
+
+
+def test_from_json(case):
+    filename, iterations = case
+    store = IterationsStore.from_json(filename)
+
+    assert store.folder == filename.replace('.json', '.iterations')
+    assert len(store) == 5
+    assert store.fields == ['areas', 'forces', 'compliance', 'volume']
+    assert 'areas' in store and 'angles' not in store
+    assert store.idt.tolist() == [10, 20, 30, 40, 50]
+    np.testing.assert_array_equal(store['areas'], [iteration['areas'] for iteration in iterations])
+    np.testing.assert_array_equal(store['compliance'], [iteration['compliance'] for iteration in iterations])
+    assert isinstance(store['areas'], np.memmap) and not store['areas'].flags.writeable
+
+    iteration = store.iteration(30)
+    assert iteration.idt == 30
+    np.testing.assert_array_equal(iteration.areas, iterations[2]['areas'])
+    assert iteration.angles is None
+
+    with pytest.raises(KeyError):
+        store.index(35)
+    with pytest.raises(KeyError):
+        store['angles']
+
+
+def test_matches_stream(case):
+    filename, _ = case
+    store = IterationsStore.from_json(filename)
+    for iteration in ResultIterations.stream(filename, start=1, step=2):
+        np.testing.assert_array_equal(store.iteration(iteration.idt).areas, iteration.areas)
+        assert store['compliance'][store.index(iteration.idt)] == iteration.compliance
+
+
+def test_open(case):
+    filename, _ = case
+    with pytest.raises(FileNotFoundError):
+        IterationsStore.open(filename, convert=False)
+
+    assert len(IterationsStore.open(filename)) == 5
+    idt_path = os.path.join(IterationsStore.folder_of(filename), 'idt.npy')
+    converted = os.path.getmtime(idt_path)
+    assert len(IterationsStore.open(filename)) == 5
+    assert os.path.getmtime(idt_path) == converted
+
+    # A newer result file is converted again
+    write_case(filename, 7)
+    os.utime(filename, (converted + 10, converted + 10))
+    assert len(IterationsStore.open(filename)) == 7
+    assert len(IterationsStore.open(filename, convert=False)) == 7
+    assert not os.path.exists(IterationsStore.folder_of(filename) + '.tmp')
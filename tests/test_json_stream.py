@@ -0,0 +1,65 @@
+import io
+import json
+
+import pytest
+
+from data_handler.json_stream import JsonStream
+
+DOCUMENT = {
+    'save_data': {'step': 10, 'label': 'quote \" backslash \\\\ and braces {[}]'},
+    'iterations': [{'idt': 10, 'areas': [1.5, -2e-3, 0], 'flag': True},
+                   {'idt': 20, 'areas': [], 'note': None, 'text': 'café \\u00e9 \\n'},
+                   {'idt': 30, 'nested': {'a': [[1], [2, [3]]], 'b': {}}}],
+    'last': 123456789.125,
+    'literals': [True, False, None, -0.5e10],
+}
+
+
+def walk(stream):
+    """
+    Rebuilds the value at the current position through iter_object and iter_array.
+    """
+    if stream.peek() == '{':
+        return {key: walk(stream) for key in stream.iter_object()}
+    if stream.peek() == '[':
+        return [walk(stream) for _ in stream.iter_array()]
+    return stream.read_value()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64, JsonStream.CHUNK_SIZE])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_chunk_boundaries(chunk_size, indent):
+    text = json.dumps(DOCUMENT, indent=indent)
+    assert walk(JsonStream(io.StringIO(text), chunk_size=chunk_size)) == json.loads(text)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64])
+def test_skip_value(chunk_size):
+    stream = JsonStream(io.StringIO(json.dumps(DOCUMENT)), chunk_size=chunk_size)
+    values = {}
+    for key in stream.iter_object():
+        if key == 'iterations':
+            ids = []
+            for _ in stream.iter_array():
+                for field in stream.iter_object():
+                    if field == 'idt':
+                        ids.append(stream.read_value())
+                    else:
+                        stream.skip_value()
+            values[key] = ids
+        elif key == 'last':
+            values[key] = stream.read_value()
+        else:
+            stream.skip_value()
+    assert values == {'iterations': [10, 20, 30], 'last': DOCUMENT['last']}
+
+
+@pytest.mark.parametrize('text', ['{"a": [1, 2', '{"a": "open', '{"a": {"b": [1]}'])
+def test_truncated_document(text):
+    stream = JsonStream(io.StringIO(text), chunk_size=2)
+    with pytest.raises(ValueError):
+        walk(stream)
+    stream = JsonStream(io.StringIO(text), chunk_size=2)
+    with pytest.raises(ValueError):
+        for _ in stream.iter_object():
+            stream.skip_value()
@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+from data_handler import ResultCache, Optimizer, SaveData, ComplianceNominal
+
+
+def make_case(volume_max=1.0):
+    return {'input_structure': {'nodes': [], 'elements': [], 'materials': [{'idt': 1, 'young': 1.0}]},
+            'optimizer': Optimizer(compliance=ComplianceNominal(), volume_max=volume_max).to_dict(),
+            'save_data': SaveData().to_dict()}
+
+
+def write(filename, dct):
+    with open(filename, 'w') as file:
+        json.dump(dct, file)
+    return str(filename)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / 'cache'))
+
+
+def test_key():
+    case = make_case()
+    reordered = {section: dict(reversed(list(value.items()))) for section, value in reversed(list(case.items()))}
+    results = {**case, 'iterations': [{'idt': 10}], 'last_iteration': {'idt': 10}}
+
+    assert ResultCache.key(reordered) == ResultCache.key(case) == ResultCache.key(results)
+    assert ResultCache.key(make_case(volume_max=2.0)) != ResultCache.key(case)
+    # warm_start is only written when set, so the keys of the other cases do not change
+    assert 'warm_start' not in case['optimizer']
+    optimizer = Optimizer(compliance=ComplianceNominal(), warm_start=True)
+    assert ResultCache.key({**case, 'optimizer': optimizer.to_dict()}) != ResultCache.key(case)
+
+
+def test_key_of_file(tmp_path):
+    case = make_case()
+    filename = write(tmp_path / 'case.json', {'iterations': [{'idt': 10, 'areas': [1.0]}], **case})
+    assert ResultCache.key_of_file(filename) == ResultCache.key(case)
+
+
+def test_get_and_put(cache, tmp_path):
+    case = {**make_case(), 'last_iteration': {'idt': 10}}
+    key = ResultCache.key(case)
+    target = str(tmp_path / 'target.json')
+
+    assert key not in cache
+    assert not cache.get(key, target)
+    assert not os.path.exists(target)
+
+    cache.put(key, write(tmp_path / 'case.json', case))
+    assert key in cache
+    assert cache.get(key, target)
+    with open(target) as file:
+        assert json.load(file) == case
+    assert not [name for name in os.listdir(cache.folder) if name.endswith('.tmp')]
+
+    cache.clear()
+    assert key not in cache
+
+
+def test_lru_eviction(cache, tmp_path):
+    keys = [ResultCache.key(make_case(volume_max)) for volume_max in (1.0, 2.0, 3.0)]
+    filename = write(tmp_path / 'case.json', {'data': 'x' * 1000})
+    size = os.path.getsize(filename)
+    cache.max_bytes = 2 * size
+
+    for age, key in zip((300, 200), keys):
+        cache.put(key, filename)
+        os.utime(cache.path(key), (os.path.getmtime(filename) - age,) * 2)
+
+    # Using the oldest result makes the other one the least recently used
+    assert cache.get(keys[0], str(tmp_path / 'target.json'))
+    cache.put(keys[2], filename)
+    assert keys[0] in cache and keys[2] in cache
+    assert keys[1] not in cache
+
+    cache.max_bytes = size - 1
+    cache.evict()
+    assert not os.listdir(cache.folder)
@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+
+import pytest
+
+from data_handler import ResultLog
+
+
+class Writer:
+    """
+    Simulates the log writer of the julia optimizer: a new run truncates the log and writes its run line, then the
+    iterations and the finished line are appended.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def start(self, run):
+        with open(self.path, 'w') as file:
+            file.write(json.dumps({'run': run}) + '\n')
+
+    def write(self, text):
+        with open(self.path, 'a') as file:
+            file.write(text)
+
+    def iteration(self, idt, compliance=1.0):
+        self.write(json.dumps({'idt': idt, 'compliance': compliance}) + '\n')
+
+    def finish(self, idt):
+        self.write(json.dumps({'finished': True, 'idt': idt}) + '\n')
+
+
+@pytest.fixture
+def log(tmp_path):
+    return ResultLog(str(tmp_path / 'case.json'))
+
+
+@pytest.fixture
+def writer(log):
+    return Writer(log.path)
+
+
+def idts(iterations):
+    return [iteration.idt for iteration in iterations]
+
+
+def test_path(log, tmp_path):
+    assert log.path == str(tmp_path / 'case.log.jsonl')
+    assert log.read_new() == []
+
+
+def test_partial_line(log, writer):
+    writer.start('a')
+    writer.iteration(10)
+    line = json.dumps({'idt': 20, 'compliance': 2.0}) + '\n'
+    writer.write(line[:7])
+    assert idts(log.read_new()) == [10]
+    assert log.run == 'a'
+    assert log.read_new() == []
+
+    writer.write(line[7:])
+    writer.finish(21)
+    iterations = log.read_new()
+    assert idts(iterations) == [20]
+    assert iterations[0].compliance == 2.0
+    assert log.finished
+
+
+def test_crashed_run_and_restart(log, writer):
+    # The first run crashes after two iterations, with a partial line
+    writer.start('a')
+    writer.iteration(10)
+    writer.iteration(20)
+    writer.write('{"idt": 3')
+    assert idts(log.read_new()) == [10, 20]
+    assert not log.finished
+
+    # A new run writes more than the offset, so only the run line tells it apart
+    writer.start('b')
+    for idt in (10, 20, 30, 40):
+        writer.iteration(idt, compliance=0.5)
+    iterations = log.read_new()
+    assert idts(iterations) == [10, 20, 30, 40]
+    assert {iteration.compliance for iteration in iterations} == {0.5}
+    assert log.run == 'b'
+
+    writer.finish(41)
+    assert log.read_new() == []
+    assert log.finished
+    assert idts(log.iterations()) == [10, 20, 30, 40]
+
+
+def test_shorter_new_run(log, writer):
+    writer.start('a')
+    for idt in (10, 20, 30):
+        writer.iteration(idt)
+    writer.finish(31)
+    assert idts(log.read_new()) == [10, 20, 30]
+    assert log.finished
+
+    writer.start('b')
+    assert log.read_new() == []
+    assert log.run == 'b'
+    assert not log.finished
+
+
+def test_offset_in_the_middle_of_a_line(log, writer):
+    # Logs without the run line: the first lines of both runs are equal and the offset falls inside a longer line
+    writer.write(json.dumps({'idt': 10}) + '\n')
+    writer.write(json.dumps({'idt': 20}) + '\n')
+    assert idts(log.read_new()) == [10, 20]
+
+    with open(log.path, 'w') as file:
+        file.write(json.dumps({'idt': 10}) + '\n')
+        file.write(json.dumps({'idt': 20, 'compliance': 123456.0}) + '\n')
+    assert idts(log.read_new()) == [10, 20]
+
+
+def test_clear(log, writer):
+    writer.start('a')
+    writer.iteration(10)
+    log.read_new()
+    log.clear()
+    assert log.offset == 0 and log.run is None
+    assert log.read_new() == []
+
+
+def test_follow(log, writer):
+    def run():
+        writer.start('a')
+        for idt in (10, 20, 30):
+            time.sleep(0.02)
+            writer.iteration(idt)
+        writer.finish(31)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert idts(log.follow(poll_interval=0.01, timeout=5.0)) == [10, 20, 30]
+    thread.join()
+
+
+def test_follow_crashed_process(log, writer):
+    writer.start('a')
+    writer.iteration(10)
+    assert idts(log.follow(poll_interval=0.01, alive=lambda: False)) == [10]
@@ -0,0 +1,99 @@
+import json
+import sys
+import textwrap
+
+import pytest
+
+from data_handler import OptimizationWorker
+
+# Stub of worker.jl speaking the same json lines protocol: an in-memory case is returned with "optimized" set, a file
+# request writes "optimized" to the file, a case with "fail" gets an error reply and a case with "exit" kills the
+# process in the middle of the request
+STUB = textwrap.dedent('''
+    import json
+    import sys
+
+    def reply(message):
+        print(json.dumps(message), flush=True)
+
+    if len(sys.argv) > 1:
+        print(f'warm up {sys.argv[1]}', file=sys.stderr, flush=True)
+    reply({'status': 'ready'})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        idt = None
+        try:
+            request = json.loads(line)
+            idt = request.get('id')
+            if 'case' in request:
+                case = request['case']
+                if case.get('exit'):
+                    sys.exit(3)
+                if case.get('fail'):
+                    raise ValueError('the case failed')
+                message = {'status': 'ok', 'case': {**case, 'optimized': True}}
+            else:
+                with open(request['filename']) as file:
+                    case = json.load(file)
+                with open(request['filename'], 'w') as file:
+                    json.dump({**case, 'optimized': True}, file)
+                message = {'status': 'ok', 'filename': request['filename']}
+        except Exception as error:
+            message = {'status': 'error', 'message': str(error)}
+        message['id'] = idt
+        reply(message)
+''')
+
+
+@pytest.fixture
+def command():
+    return [sys.executable, '-c', STUB]
+
+
+def test_optimize_dict_and_file(command, tmp_path):
+    filename = tmp_path / 'case.json'
+    filename.write_text(json.dumps({'structure': {}}))
+
+    with OptimizationWorker(command) as worker:
+        assert worker.optimize_dict({'structure': {'nodes': [1]}}) == {'structure': {'nodes': [1]}, 'optimized': True}
+        worker.optimize_file(str(filename))
+        assert json.loads(filename.read_text()) == {'structure': {}, 'optimized': True}
+        assert worker.alive
+
+    assert not worker.alive
+    assert worker._process.returncode == 0
+
+
+def test_error_reply_keeps_the_worker(command):
+    with OptimizationWorker(command) as worker:
+        with pytest.raises(RuntimeError, match='the case failed'):
+            worker.optimize_dict({'fail': True})
+        # The ids of the next replies still match their requests
+        assert worker.optimize_dict({'a': 1}) == {'a': 1, 'optimized': True}
+        with pytest.raises(RuntimeError, match='No such file'):
+            worker.optimize_file('missing.json')
+        assert worker.alive
+
+
+def test_worker_exit(command):
+    with OptimizationWorker(command) as worker:
+        with pytest.raises(RuntimeError, match='exited with code 3'):
+            worker.optimize_dict({'exit': True})
+        with pytest.raises(RuntimeError, match='exited with code 3'):
+            worker.optimize_dict({'a': 1})
+
+
+def test_warm_up_and_log(command, tmp_path):
+    warm_up = tmp_path / 'warm_up.json'
+    log_file = tmp_path / 'worker.log'
+    with OptimizationWorker(command, warm_up=str(warm_up), log_file=str(log_file)) as worker:
+        assert worker.optimize_dict({}) == {'optimized': True}
+    assert log_file.read_text() == f'warm up {warm_up}\n'
+
+
+def test_unexpected_reply():
+    command = [sys.executable, '-c', 'print(\'{"status": "ok", "id": 7}\', flush=True)']
+    with pytest.raises(RuntimeError, match='Unexpected reply'):
+        OptimizationWorker(command)
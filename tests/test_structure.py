@@ -0,0 +1,98 @@
+import json
+
+import numpy as np
+import pytest
+
+from data_handler import Structure, Node, Element, Material
+
+
+@pytest.fixture
+def structure():
+    return Structure.from_arrays(positions=[[0.0, 0.0], [3.0, 0.0], [3.0, 4.0]],
+                                 connectivity=[[0, 1], [1, 2], [0, 2]],
+                                 materials=[Material(1, 200.0), Material(5, 70.0)],
+                                 areas=[1.0, 2.0, 3.0],
+                                 material_index=[0, 1, 0],
+                                 layout_constraints=[0, 2, 2],
+                                 forces=[[0.0, 0.0], [0.0, 0.0], [1.0, -2.0]],
+                                 supports=[[True, True], [False, True], [False, False]],
+                                 node_ids=[10, 20, 30],
+                                 element_ids=[7, 8, 9])
+
+
+def test_from_arrays(structure):
+    assert structure.connectivity.dtype == np.int32
+    np.testing.assert_allclose(structure.lengths, [3.0, 4.0, 5.0])
+    np.testing.assert_allclose(structure.cosines, [1.0, 0.0, 0.6])
+    np.testing.assert_allclose(structure.sines, [0.0, 1.0, 0.8])
+    np.testing.assert_allclose(structure.youngs(), [200.0, 70.0, 200.0])
+
+    element = structure.elements[1]
+    assert element.idt == 8
+    assert [node.idt for node in element.nodes] == [20, 30]
+    assert element.material.idt == 5
+    assert element.layout_constraint == 2
+    assert element.length() == 4.0
+    assert structure.nodes[2].force.tolist() == [1.0, -2.0]
+
+
+def test_defaults():
+    structure = Structure.from_arrays(positions=np.zeros((3, 2)), connectivity=[[0, 1], [1, 2]],
+                                      materials=[Material(1, 1.0)], areas=0.5)
+    assert structure.node_ids.tolist() == [1, 2, 3]
+    assert structure.element_ids.tolist() == [1, 2]
+    assert structure.areas.tolist() == [0.5, 0.5]
+    assert not structure.forces.any() and not structure.supports.any()
+    assert structure.material_index.tolist() == structure.layout_constraints.tolist() == [0, 0]
+
+
+def test_dict_round_trip(structure):
+    dct = json.loads(json.dumps(structure.to_dict()))
+    assert dct['elements'][1] == {'idt': 8, 'nodes': [20, 30], 'material': 5, 'area': 2.0, 'layout_constraint': 2}
+
+    read = Structure.read_dict(dct)
+    assert read.to_dict() == dct
+    for name in ('node_ids', 'positions', 'forces', 'supports', 'element_ids', 'connectivity', 'areas',
+                 'material_index', 'layout_constraints'):
+        np.testing.assert_array_equal(getattr(read, name), getattr(structure, name))
+
+
+def test_objects_become_views():
+    material = Material(1, 1.0)
+    nodes = [Node(1, [0.0, 0.0], support=[True, True]), Node(2, [2.0, 0.0], force=[0.0, -1.0])]
+    element = Element(1, nodes, material, area=1.5, layout_constraint=0)
+    structure = Structure(nodes, [element], [material])
+
+    nodes[1].force = [1.0, 1.0]
+    assert structure.forces[1].tolist() == [1.0, 1.0]
+    structure.areas[0] = 4.0
+    assert element.area == 4.0
+    assert structure.to_dict() == Structure.read_dict(structure.to_dict()).to_dict()
+
+
+def test_read_only_geometry(structure):
+    for array in (structure.positions, structure.connectivity, structure.lengths):
+        with pytest.raises(ValueError):
+            array[0] = 0
+
+    # Changes through the views, move_nodes and assignments recompute the cached geometry
+    structure.nodes[1].position = [6.0, 0.0]
+    assert structure.positions[1].tolist() == [6.0, 0.0]
+    np.testing.assert_allclose(structure.lengths, [6.0, 5.0, 5.0])
+
+    structure.move_nodes([2], [[0.0, 4.0]])
+    np.testing.assert_allclose(structure.lengths, [6.0, np.hypot(6.0, 4.0), 4.0])
+
+    structure.elements[0].nodes = [structure.nodes[0], structure.nodes[2]]
+    assert structure.connectivity[0].tolist() == [0, 2]
+    np.testing.assert_allclose(structure.lengths[0], 4.0)
+
+    structure.positions = structure.positions * 2
+    np.testing.assert_allclose(structure.lengths, [8.0, 2 * np.hypot(6.0, 4.0), 8.0])
+    assert not structure.positions.flags.writeable
+
+
+def test_nodes_of_another_structure(structure):
+    other = Structure.from_arrays(positions=np.zeros((2, 2)), connectivity=[[0, 1]], materials=[Material(1, 1.0)])
+    with pytest.raises(ValueError):
+        structure.elements[0].nodes = other.nodes
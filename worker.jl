@@ -0,0 +1,69 @@
+include("src/otm/otm.jl")
+
+# Persistent optimization worker. The code is loaded and compiled once and the cases are received through stdin, one
+# json request per line:
+#
+#   {"id": 1, "filename": "case.json"}  optimizes the file in place (as main.jl does)
+#   {"id": 2, "case": {...}}            optimizes an in-memory case and replies with the resulting file contents
+#
+# Every request gets one json reply per line in stdout, with the id of the request and "status" set to "ok" or
+# "error". The log of the optimizations goes to stderr. An optional json case passed as argument is optimized at
+# startup (on a temporary copy) to compile the optimizer before the first request.
+
+const protocol = stdout
+redirect_stdout(stderr)
+
+function optimize_file(filename::String)
+    otm = generate_optimizer(filename)
+    optimize!(otm)
+end
+
+function optimize_case(case::Dict)::Dict
+    filename = tempname() * ".json"
+    try
+        open(filename, "w") do io
+            JSON.print(io, case)
+        end
+        optimize_file(filename)
+        return JSON.parsefile(filename)
+    finally
+        rm(filename, force=true)
+        rm(replace(filename, r"\.json$" => "") * ".log.jsonl", force=true)
+    end
+end
+
+# Replies are Dict{String,Any}, so the id (an integer or nothing) can be added to any of them
+function handle(request::Dict)::Dict{String,Any}
+    if haskey(request, "case")
+        return Dict{String,Any}("status" => "ok", "case" => optimize_case(request["case"]))
+    end
+    filename = request["filename"]
+    optimize_file(filename)
+    return Dict{String,Any}("status" => "ok", "filename" => filename)
+end
+
+function reply(message::Dict)
+    println(protocol, JSON.json(message))
+    flush(protocol)
+end
+
+if !isempty(ARGS)
+    optimize_case(JSON.parsefile(ARGS[1]))
+end
+
+reply(Dict{String,Any}("status" => "ready"))
+
+for line in eachline(stdin)
+    isempty(strip(line)) && continue
+
+    id = nothing
+    message = try
+        request = JSON.parse(line)
+        id = get(request, "id", nothing)
+        handle(request)
+    catch err
+        Dict{String,Any}("status" => "error", "message" => sprint(showerror, err))
+    end
+    message["id"] = id
+    reply(message)
+end